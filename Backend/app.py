@@ -1,9 +1,17 @@
-from flask import Flask, request, jsonify, send_file, make_response
+from flask import Flask, request, jsonify, send_file, make_response, Response, stream_with_context
 from flask_cors import CORS
 import importlib
 import shutil
 import os
 import json
+import inspect
+import math
+import time
+from jobs import JobQueue, QueueFullError
+from result_store import ResultStore, canonical_key
+import plotting
+import metrics
+import tsplib
 
 app = Flask(__name__)
 CORS(app)
@@ -23,6 +31,11 @@ PROBLEM_LIST = [
     {"id": "csv_optimizer", "name": "CSV Optimizer"},
 ]
 
+job_queue = JobQueue(max_workers=4)
+# Set GA_RESULTS_DIR to also keep finished runs on disk
+result_store = ResultStore(max_entries=200, ttl=60 * 60, persist_dir=os.environ.get("GA_RESULTS_DIR"))
+plotting.get_store().start_sweeper()
+
 @app.route('/')
 def index():
     return jsonify({"message": "Backend up!"})
@@ -48,6 +61,40 @@ def load_problem_module(problem_id):
     else:
         return importlib.import_module(f'problems.{problem_id}')
 
+def execute_problem(problem_id, params, on_generation=None):
+    key = canonical_key(problem_id, params)
+    # Seeded runs are reproducible, so an identical request can reuse the stored result.
+    # Uploaded custom problems may draw from unseeded random state, so they always run.
+    if params and "seed" in params and not problem_id.startswith("custom:"):
+        cached = result_store.get_by_key(key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+    module = load_problem_module(problem_id)
+    stopped = []
+    def report(info):
+        keep_going = on_generation(info)
+        if keep_going is False:
+            stopped.append(info)
+        return keep_going
+
+    started = time.perf_counter()
+    # Custom problems may not accept a progress callback
+    if on_generation is not None and "on_generation" in inspect.signature(module.run_problem).parameters:
+        result, plot_path = module.run_problem(params, on_generation=report)
+    else:
+        result, plot_path = module.run_problem(params)
+    metrics.record_run(problem_id, result, time.perf_counter() - started)
+    payload = {
+        "result": result,
+        "plotFilename": os.path.basename(plot_path),
+        "runId": result_store.new_run_id(),
+    }
+    # Runs stopped early are partial and must not answer later identical requests
+    if not stopped:
+        result_store.put(payload["runId"], key, payload)
+    return payload
+
 @app.route('/api/problems', methods=['GET'])
 def get_problems():
     all_probs = PROBLEM_LIST.copy()
@@ -77,6 +124,34 @@ def upload_csv():
     preview_data = df.to_dict(orient="records")
     return jsonify({'message': 'File uploaded', 'filename': safe_filename, 'headers': headers, 'preview': preview_data})
 
+@app.route('/api/upload_tsp', methods=['POST'])
+def upload_tsp():
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    if not file.filename.endswith('.tsp'):
+        return jsonify({'error': 'Only .tsp files allowed'}), 400
+    safe_filename = file.filename.replace("/", "_").replace("\\", "_")
+    save_path = os.path.join(tsplib.UPLOAD_DIR, safe_filename)
+    if not os.path.exists(tsplib.UPLOAD_DIR):
+        os.makedirs(tsplib.UPLOAD_DIR)
+    file.save(save_path)
+    # Parse now so the first run finds the distance matrix already cached
+    try:
+        instance = tsplib.load(save_path)
+    except (ValueError, KeyError, IndexError) as e:
+        os.remove(save_path)
+        return jsonify({'error': f'Invalid TSPLIB file: {e}'}), 400
+    return jsonify({
+        'message': 'File uploaded',
+        'filename': safe_filename,
+        'name': instance['name'],
+        'dimension': instance['dimension'],
+        'edgeWeightType': instance['edge_weight_type'],
+    })
+
 
 
 @app.route('/api/problem_params/<problem_id>', methods=['GET'])
@@ -91,38 +166,107 @@ def get_problem_params(problem_id):
 @app.route('/api/run_problem/<problem_id>', methods=['POST'])
 def run_problem(problem_id):
     try:
-        module = load_problem_module(problem_id)
         params = request.json
-        result, plot_path = module.run_problem(params)
-        plot_filename = os.path.basename(plot_path)
-        return jsonify({
-            "result": result,
-            "plotFilename": plot_filename
-        })
+        # ?async=1 queues the run and returns a job id to poll
+        if request.args.get("async") == "1":
+            job = job_queue.submit(problem_id, params, execute_problem)
+            return jsonify(job.to_dict()), 202
+        return jsonify(execute_problem(problem_id, params))
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "No such job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "No such job"}), 404
+    return jsonify(job.to_dict())
+
+def sse_json(data):
+    # JSON has no Infinity/NaN, which infeasible scores (e.g. CSV constraints) produce
+    return json.dumps({k: None if isinstance(v, float) and not math.isfinite(v) else v for k, v in data.items()})
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "No such job"}), 404
+
+    def generate():
+        sent = 0
+        while True:
+            events, finished = job.wait_events(sent, timeout=15)
+            for event in events:
+                yield f"event: generation\ndata: {sse_json(event)}\n\n"
+            sent += len(events)
+            if finished:
+                yield f"event: end\ndata: {sse_json({'status': job.status, 'error': job.error})}\n\n"
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "No such job"}), 404
+    if job.status == "error":
+        return jsonify({"error": job.error}), 500
+    if job.result is None:
+        return jsonify(job.to_dict()), 202
+    return jsonify(job.result)
+
 @app.route('/api/plot/<plot_filename>')
 def get_plot(plot_filename):
-    plot_path = os.path.join("plots", plot_filename)
-    if os.path.exists(plot_path):
-        # Serve as inline by default (for <img> display)
-        if request.args.get("download") == "1":
-            # For download: force as attachment with filename
-            return send_file(plot_path, mimetype='image/png', as_attachment=True, attachment_filename=plot_filename)
-        else:
-            # For browser display: inline
-            return send_file(plot_path, mimetype='image/png')
-    else:
+    # Plots are drawn on first request; the filename is unique per run so the PNG never changes
+    plot_path = plotting.render(os.path.basename(plot_filename))
+    if plot_path is None:
         return "No plot found", 404
+    plot_path = os.path.abspath(plot_path)
+    if request.args.get("download") == "1":
+        # For download: force as attachment with filename
+        response = send_file(plot_path, mimetype='image/png', as_attachment=True, download_name=plot_filename, conditional=True, etag=True)
+    else:
+        # For browser display: inline
+        response = send_file(plot_path, mimetype='image/png', conditional=True, etag=True)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    # Prometheus text format: run counts, evaluations and per-phase GA timings
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/plot_store', methods=['GET'])
+def plot_store_stats():
+    return jsonify(plotting.get_store().stats())
 
 @app.route('/api/download_solution/<problem_id>', methods=['POST'])
 def download_solution(problem_id):
     try:
-        module = load_problem_module(problem_id)
         params = request.json
-        result, _ = module.run_problem(params)
-        solution_json = json.dumps(result, indent=2)
+        # Serve the run the user is looking at rather than computing a new random one
+        run_id = request.args.get("run_id")
+        if run_id:
+            payload = result_store.get(run_id)
+            if payload is None:
+                return jsonify({"error": "Run not found or expired"}), 404
+        else:
+            # Without a run_id only a seeded run can be matched by its params (execute_problem
+            # reuses those); an unseeded one may be another client's, so compute a fresh run
+            payload = execute_problem(problem_id, params)
+        solution_json = json.dumps(payload["result"], indent=2)
         response = make_response(solution_json)
         response.headers['Content-Type'] = 'application/json'
         response.headers['Content-Disposition'] = f'attachment; filename="{problem_id}_solution.json"'
@@ -0,0 +1,40 @@
+import numpy as np
+import rng
+
+# Whole-population operators for the array engine in GeneticAlgorithm.
+# Every function takes/returns a 2-D array with one individual per row.
+
+def random_bits(population_size, length):
+    return rng.get().integers(0, 2, size=(population_size, length), dtype=np.uint8)
+
+def uniform_reals(population_size, dim, low, high):
+    return rng.get().uniform(low, high, size=(population_size, dim))
+
+def one_point_crossover(parents1, parents2):
+    n, length = parents1.shape
+    points = rng.get().integers(1, length, size=n)
+    mask = np.arange(length) < points[:, None]
+    return np.where(mask, parents1, parents2)
+
+def blend_crossover(parents1, parents2):
+    alpha = rng.get().random((len(parents1), 1))
+    return alpha * parents1 + (1 - alpha) * parents2
+
+def bit_flip(population, rate):
+    flips = rng.get().random(population.shape) < rate
+    return population ^ flips.astype(population.dtype)
+
+def gaussian_mutation(population, rate, sigma):
+    generator = rng.get()
+    mask = generator.random(population.shape) < rate
+    return population + mask * generator.normal(0, sigma, population.shape)
+
+def random_reset_tracked(population, rate, low, high):
+    # Each gene is redrawn uniformly from [low, high] (integers) with probability rate;
+    # also returns the (rows, positions) redrawn
+    generator = rng.get()
+    mask = generator.random(population.shape) < rate
+    return np.where(mask, generator.integers(low, high + 1, population.shape), population), np.nonzero(mask)
+
+def random_reset(population, rate, low, high):
+    return random_reset_tracked(population, rate, low, high)[0]
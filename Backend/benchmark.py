@@ -0,0 +1,260 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+
+# Headless benchmark of the bundled problems. Each problem runs at a few scales, every
+# run in a fresh process so peak memory and warm caches don't carry over between cases,
+# and plotting is switched off. The JSON report is meant to be diffed between commits:
+#   python benchmark.py --scales small,medium --output before.json
+#   ... change something ...
+#   python benchmark.py --scales small,medium --output after.json --baseline before.json
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SCALES = ("small", "medium", "large")
+CURVE_POINTS = 50
+CSV_ROWS = {"small": 10_000, "medium": 100_000, "large": 1_000_000}
+
+BENCHMARKS = {
+    "max_ones": {
+        "small": {"length": 100, "population_size": 100, "generations": 100},
+        "medium": {"length": 1000, "population_size": 200, "generations": 200},
+        "large": {"length": 10000, "population_size": 500, "generations": 300},
+    },
+    "tsp": {
+        "small": {"num_cities": 20, "population_size": 100, "generations": 100},
+        "medium": {"num_cities": 100, "population_size": 200, "generations": 200},
+        "large": {"num_cities": 500, "population_size": 300, "generations": 300},
+    },
+    "knapsack": {
+        "small": {"population_size": 50, "generations": 80},
+        "medium": {"population_size": 500, "generations": 200},
+        "large": {"population_size": 5000, "generations": 300},
+    },
+    "bitstring_match": {
+        "small": {"population_size": 50, "generations": 100},
+        "medium": {"population_size": 500, "generations": 200},
+        "large": {"population_size": 5000, "generations": 300},
+    },
+    "sudoku4x4": {
+        "small": {"population_size": 100, "generations": 150},
+        "medium": {"population_size": 1000, "generations": 300},
+        "large": {"population_size": 10000, "generations": 500},
+    },
+    "deceptive_trap": {
+        "small": {"n": 30, "k": 5, "population_size": 120, "generations": 120},
+        "medium": {"n": 300, "k": 5, "population_size": 300, "generations": 300},
+        "large": {"n": 3000, "k": 5, "population_size": 1000, "generations": 500},
+    },
+    "noisy_onemax": {
+        "small": {"n": 50, "population_size": 100, "generations": 100},
+        "medium": {"n": 500, "population_size": 300, "generations": 200},
+        "large": {"n": 5000, "population_size": 1000, "generations": 300},
+    },
+    "rastrigin": {
+        "small": {"dimensions": 2, "population_size": 100, "generations": 80},
+        "medium": {"dimensions": 10, "population_size": 500, "generations": 200},
+        "large": {"dimensions": 100, "population_size": 2000, "generations": 300},
+    },
+    "royal_road": {
+        "small": {"n": 64, "block_size": 8, "population_size": 100, "generations": 100},
+        "medium": {"n": 512, "block_size": 8, "population_size": 500, "generations": 200},
+        "large": {"n": 4096, "block_size": 8, "population_size": 2000, "generations": 300},
+    },
+    "sphere": {
+        "small": {"dimensions": 3, "population_size": 100, "generations": 60},
+        "medium": {"dimensions": 15, "population_size": 500, "generations": 200},
+        "large": {"dimensions": 150, "population_size": 2000, "generations": 300},
+    },
+    "multiobjective_schaffer": {
+        "small": {"population_size": 100, "generations": 60},
+        "medium": {"population_size": 300, "generations": 100},
+        "large": {"population_size": 1000, "generations": 200},
+    },
+    "csv_optimizer": {
+        scale: {
+            "csv_filename": f"benchmark_{scale}.csv", "mode": "subset", "objective_col": "value",
+            "constraint_col": "weight", "constraint_op": "<=", "constraint_value": rows * 0.004,
+            "subset_density": 0.01, "population_size": 50, "generations": 30,
+        }
+        for scale, rows in CSV_ROWS.items()
+    },
+}
+
+def write_datasets(workdir, scales, seed):
+    # Synthetic CSVs for csv_optimizer, in the uploaded_csvs folder it reads from
+    folder = os.path.join(workdir, "uploaded_csvs")
+    os.makedirs(folder, exist_ok=True)
+    generator = np.random.default_rng(seed)
+    for scale in scales:
+        data = generator.random((CSV_ROWS[scale], 2))
+        np.savetxt(os.path.join(folder, f"benchmark_{scale}.csv"), data, delimiter=",",
+                   header="value,weight", comments="", fmt="%.6f")
+
+def _thin(curve, points):
+    # At most `points` evenly spaced (seconds, best) pairs, always keeping the last
+    if len(curve) > points:
+        picks = np.unique(np.linspace(0, len(curve) - 1, points).round().astype(int))
+        curve = [curve[i] for i in picks]
+    return [[round(t, 6), value] for t, value in curve]
+
+def _best(result):
+    for key in ("score", "best_score"):
+        if isinstance(result.get(key), (int, float)):
+            return float(result[key])
+    # Multi-objective runs report a front rather than a score: use the final hypervolume
+    history = result.get("history")
+    return float(history[-1]) if history else None
+
+def _cache_hits(stats):
+    # Individuals scored from the fitness cache without a fitness call, summed over islands.
+    # A resampling cache evaluates every individual, so its hits are already in evaluations.
+    if "island_stats" in stats:
+        return sum(_cache_hits(island) for island in stats["island_stats"])
+    cache = stats.get("cache") or {}
+    return 0 if cache.get("resample") else cache.get("hits", 0)
+
+def run_case(problem_id, params, workdir):
+    # One benchmark run; executed in a process of its own
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(workdir)
+    import plotting
+    plotting.ENABLED = False
+    module = importlib.import_module(f"problems.{problem_id}")
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    curve = []
+    started = time.perf_counter()
+
+    def on_generation(info):
+        curve.append((time.perf_counter() - started, info.get("best_so_far", info.get("hypervolume"))))
+        return True
+
+    result, _ = module.run_problem(params, on_generation=on_generation)
+    wall_time = time.perf_counter() - started
+    stats = result.get("stats") or {}
+    # evaluations counts fitness calls (delta ones included); cache hits score individuals without one
+    evaluations = stats.get("evaluations")
+    scored = evaluations + _cache_hits(stats) if evaluations is not None else None
+    profile = stats.get("profile") or {}
+    return {
+        "wall_time": wall_time,
+        "evaluations": evaluations,
+        "cache_hits": _cache_hits(stats),
+        "individuals_per_second": scored / wall_time if scored and wall_time > 0 else None,
+        # ru_maxrss is in KiB on Linux; the baseline is the interpreter plus imports before the run
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "baseline_rss_mb": baseline_rss,
+        "best": _best(result),
+        "stop_reason": stats.get("stop_reason"),
+        "generations_run": stats.get("generations_run"),
+        # Seconds per loop phase, from the run's profile (see profiling.py)
+        "phases": {name: phase["seconds"] for name, phase in profile.get("phases", {}).items()},
+        "curve": _thin(curve, CURVE_POINTS),
+    }
+
+def _median(runs, key):
+    values = [run[key] for run in runs if run.get(key) is not None]
+    return statistics.median(values) if values else None
+
+def summarize(problem_id, scale, params, runs):
+    case = {"problem": problem_id, "scale": scale, "params": params, "runs": runs}
+    ok = [run for run in runs if "error" not in run]
+    if ok:
+        case.update({
+            "wall_time": _median(ok, "wall_time"),
+            "individuals_per_second": _median(ok, "individuals_per_second"),
+            "peak_rss_mb": max(run["peak_rss_mb"] for run in ok),
+            "best": _median(ok, "best"),
+        })
+    return case
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def compare(report, baseline):
+    # Wall time of every case also present in the baseline report, as a ratio (< 1 is faster)
+    before = {(case["problem"], case["scale"]): case.get("wall_time") for case in baseline["results"]}
+    lines = []
+    for case in report["results"]:
+        old = before.get((case["problem"], case["scale"]))
+        new = case.get("wall_time")
+        if old and new:
+            lines.append(f"{case['problem']:<26}{case['scale']:<8}{old:>10.3f}s {new:>10.3f}s {new / old:>8.2f}x")
+    return "\n".join(lines)
+
+def run_benchmarks(problems, scales, repeat=1, seed=0):
+    report = dict(environment(), seed=seed, repeat=repeat, results=[])
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="ga_benchmark_") as workdir:
+        if "csv_optimizer" in problems:
+            write_datasets(workdir, scales, seed)
+        for problem_id in problems:
+            for scale in scales:
+                params = dict(BENCHMARKS[problem_id][scale], seed=seed)
+                runs = []
+                for _ in range(repeat):
+                    # A fresh single-use process per run: nothing is shared or pre-warmed
+                    with ProcessPoolExecutor(max_workers=1, mp_context=ctx, max_tasks_per_child=1) as pool:
+                        try:
+                            runs.append(pool.submit(run_case, problem_id, params, workdir).result())
+                        except Exception as exc:
+                            runs.append({"error": f"{type(exc).__name__}: {exc}"})
+                case = summarize(problem_id, scale, params, runs)
+                report["results"].append(case)
+                if "wall_time" in case:
+                    rate = case["individuals_per_second"]
+                    print(f"{problem_id}/{scale}: {case['wall_time']:.3f}s"
+                          + (f", {rate:,.0f} individuals/s" if rate else ""), file=sys.stderr)
+                else:
+                    print(f"{problem_id}/{scale}: {runs[-1]['error']}", file=sys.stderr)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bundled GA problems")
+    parser.add_argument("--problems", default=",".join(BENCHMARKS), help="comma-separated problem ids")
+    parser.add_argument("--scales", default="small,medium", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the report keeps medians")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--baseline", help="earlier report to compare wall times against")
+    args = parser.parse_args()
+
+    problems = [p for p in args.problems.split(",") if p]
+    scales = [s for s in args.scales.split(",") if s]
+    unknown = [p for p in problems if p not in BENCHMARKS] + [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown problem or scale: {', '.join(unknown)}")
+
+    report = run_benchmarks(problems, scales, repeat=max(1, args.repeat), seed=args.seed)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"Report written to {args.output}", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(report, json.load(f)))
+
+if __name__ == "__main__":
+    main()
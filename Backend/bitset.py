@@ -0,0 +1,132 @@
+import numpy as np
+import rng
+
+# Packed bitset genomes for binary problems: each individual is a row of uint64 words,
+# with genome bit i stored in bit (i % 64) of word i // 64 and unused high bits of the
+# last word kept at zero. A 512-bit genome is 8 words (64 bytes). Operators take the
+# genome length since the padding has to stay clear.
+
+WORD_BITS = 64
+ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+def n_words(length):
+    return -(-length // WORD_BITS)
+
+def _bit(positions):
+    return np.left_shift(np.uint64(1), np.asarray(positions, dtype=np.uint64))
+
+def _low_bits(count):
+    # Words with the lowest `count` bits set (count in 0..64)
+    count = np.asarray(count, dtype=np.uint64)
+    return np.where(count >= WORD_BITS, ONES, _bit(count % WORD_BITS) - np.uint64(1))
+
+def pack(bits):
+    # (rows, length) 0/1 array -> (rows, n_words) uint64
+    bits = np.asarray(bits, dtype=np.uint8)
+    rows, length = bits.shape
+    padded = np.zeros((rows, n_words(length) * WORD_BITS), dtype=np.uint8)
+    padded[:, :length] = bits
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+
+def unpack(words, length):
+    # (rows, n_words) uint64 -> (rows, length) uint8 of 0/1
+    words = np.ascontiguousarray(words, dtype="<u8")
+    return np.unpackbits(words.view(np.uint8), axis=1, bitorder="little")[:, :length]
+
+def unpack_one(words, length):
+    # One genome (e.g. GeneticAlgorithm's best) back to a list of 0/1 ints
+    return unpack(np.array([words], dtype=np.uint64), length)[0].tolist()
+
+def random_packed(population_size, length):
+    words = rng.get().integers(0, 2 ** 64, size=(population_size, n_words(length)), dtype=np.uint64)
+    words[:, -1] &= _low_bits(length - (n_words(length) - 1) * WORD_BITS)
+    return words
+
+def random_sparse(population_size, length, density):
+    # Each bit set with probability density, drawn as the set positions of every row so
+    # very long genomes need no (rows, length) temporary
+    generator = rng.get()
+    population = np.zeros((population_size, n_words(length)), dtype=np.uint64)
+    for row, count in enumerate(generator.binomial(length, density, population_size).tolist()):
+        positions = generator.choice(length, count, replace=False)
+        np.bitwise_or.at(population[row], positions // WORD_BITS, _bit(positions % WORD_BITS))
+    return population
+
+def set_bits(population, length):
+    # (rows, positions) of every set bit
+    return np.nonzero(unpack(population, length))
+
+def popcount(words):
+    return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+
+def block_table(length, block_size):
+    # Consecutive blocks of block_size bits (the last may be short) as the words each one
+    # spans and the mask of its bits in each, zero-padded to the widest block
+    starts = np.arange(0, length, block_size)
+    ends = np.minimum(starts + block_size, length)
+    first = starts // WORD_BITS
+    pieces = int(((ends - 1) // WORD_BITS - first).max()) + 1
+    words = first[:, None] + np.arange(pieces)
+    offsets = words * WORD_BITS
+    masks = _low_bits(np.clip(ends[:, None] - offsets, 0, WORD_BITS)) & ~_low_bits(np.clip(starts[:, None] - offsets, 0, WORD_BITS))
+    return np.minimum(words, n_words(length) - 1), masks
+
+def block_counts(population, table):
+    # Set bits per block, (rows, n_blocks)
+    words, masks = table
+    return np.bitwise_count(population[:, words] & masks).sum(axis=2, dtype=np.int64)
+
+def block_counts_at(population, rows, blocks, table):
+    # Set bits of one block per (row, block) pair
+    words, masks = table
+    return np.bitwise_count(population[rows[:, None], words[blocks]] & masks[blocks]).sum(axis=1, dtype=np.int64)
+
+def touched_blocks(changed, length, block_size):
+    # Distinct (rows, blocks) holding a changed bit, from (rows, positions) pairs
+    n_blocks = -(-length // block_size)
+    rows, positions = changed
+    return np.divmod(np.unique(rows * n_blocks + positions // block_size), n_blocks)
+
+def one_point_crossover(parents1, parents2, length):
+    # Bits before a random cut from parents1, the rest from parents2
+    rows, words = parents1.shape
+    points = rng.get().integers(1, length, size=rows)
+    cut_word, cut_bit = np.divmod(points, WORD_BITS)
+    index = np.arange(words)
+    mask = np.where(index < cut_word[:, None], ONES,
+                    np.where(index == cut_word[:, None], _low_bits(cut_bit)[:, None], np.uint64(0)))
+    return (parents1 & mask) | (parents2 & ~mask)
+
+def bit_flip_tracked(population, rate, length):
+    # XOR in a sparse mask: about rate * length flipped positions per row. Also returns the
+    # (rows, positions) flipped; a position drawn twice in a row flips back.
+    population = population.copy()
+    rows = len(population)
+    generator = rng.get()
+    flips = generator.binomial(length, rate, rows)
+    row_index = np.repeat(np.arange(rows), flips)
+    positions = generator.integers(0, length, len(row_index))
+    np.bitwise_xor.at(population, (row_index, positions // WORD_BITS), _bit(positions % WORD_BITS))
+    return population, (row_index, positions)
+
+def net_flips(changed, length):
+    # The (rows, positions) of bit_flip_tracked's changes that stayed flipped (drawn an odd number of times)
+    rows, positions = changed
+    pairs, counts = np.unique(rows * length + positions, return_counts=True)
+    return np.divmod(pairs[counts % 2 == 1], length)
+
+def diff_bits(a, b):
+    # (rows, positions) where a and b differ, unpacking only the words that do
+    diff = a ^ b
+    rows, words = np.nonzero(diff)
+    bits = np.unpackbits(diff[rows, words].astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    hit, bit = np.nonzero(bits)
+    return rows[hit], words[hit] * WORD_BITS + bit
+
+def get_bits(population, rows, positions):
+    # The bits at (rows, positions), as 0/1
+    shift = (positions % WORD_BITS).astype(np.uint64)
+    return (population[rows, positions // WORD_BITS] >> shift) & np.uint64(1)
+
+def bit_flip(population, rate, length):
+    return bit_flip_tracked(population, rate, length)[0]
@@ -1,8 +1,8 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+from functools import partial
+import numpy as np
+import rng
+import plotting
+from islands import make_ga
 
 def get_param_fields():
     return [
@@ -14,63 +14,46 @@ def get_param_fields():
     ]
 
 def create_individual(list_length, max_value):
-    return [random.randint(0, max_value) for _ in range(list_length)]
+    return rng.get().integers(0, max_value + 1, list_length).tolist()
 
 def fitness(ind):
     return sum(x for x in ind if x % 2 == 0)
 
 def breed(p1, p2):
-    point = random.randint(1, len(p1) - 2)
+    point = int(rng.get().integers(1, len(p1) - 1))
     return p1[:point] + p2[point:]
 
 def mutate(ind, max_value, rate):
-    return [x if random.random() > rate else random.randint(0, max_value) for x in ind]
+    generator = rng.get()
+    reset = generator.random(len(ind)) < rate
+    return np.where(reset, generator.integers(0, max_value + 1, len(ind)), ind).tolist()
 
-def run_problem(params):
+def run_problem(params, on_generation=None):
     list_length = int(params.get("list_length", 10))
     max_value = int(params.get("max_value", 20))
     population_size = int(params.get("population_size", 50))
     generations = int(params.get("generations", 50))
     mutation_rate = float(params.get("mutation_rate", 0.08))
 
-    pop = [create_individual(list_length, max_value) for _ in range(population_size)]
-    history = []
-    best, best_fit = None, float('-inf')
-    for g in range(generations):
-        fits = [fitness(ind) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, max_value, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
-
-    # Plot
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/even_sum_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Even Sum")
-    plt.xlabel("Generation")
-    plt.ylabel("Sum of Even Numbers")
-    plt.title("Even Number Sum Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    ga = make_ga(
+        params,
+        create_individual=partial(create_individual, list_length, max_value),
+        fitness=fitness,
+        breed=breed,
+        mutate=lambda ind, rate: mutate(ind, max_value, rate),
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
+
+    plot_path = plotting.line_plot("even_sum", history, "Best Even Sum", "Generation", "Sum of Even Numbers", "Even Number Sum Progress")
 
     result = {
         "best": best,
         "score": best_fit,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -0,0 +1,364 @@
+import argparse
+import os
+import pickle
+import queue
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from multiprocessing.connection import Listener, Client
+import numpy as np
+import rng
+
+# Fitness evaluation on worker processes that connect over TCP, possibly from other machines.
+#
+# The GA process runs a Broker. Workers connect to it (multiprocessing.connection: pickled,
+# length-prefixed messages with HMAC authentication) and take one chunk of a population
+# at a time. Fitness functions are sent once per worker and referenced by id afterwards,
+# so they must be picklable: module-level functions or functools.partial of them.
+# Workers send heartbeats while they compute; a worker that disconnects or goes quiet
+# for heartbeat_timeout seconds is dropped and its chunk is handed to another worker.
+# A chunk that loses MAX_TASK_ATTEMPTS workers fails the map() call, as does having no
+# worker connected for worker_wait seconds, so a run never waits on workers that are gone.
+#
+# Without GA_BROKER_ADDRESS the broker listens on localhost and starts its own worker
+# processes (LocalCluster). With GA_BROKER_ADDRESS=host:port it listens there and waits
+# for remote workers started with:  python distributed.py worker --address host:port
+# Both sides read the shared secret from GA_BROKER_AUTHKEY.
+
+HEARTBEAT_INTERVAL = 2.0
+HEARTBEAT_TIMEOUT = 10.0
+POLL_INTERVAL = 0.5
+MAX_WORKER_FUNCTIONS = 8
+MAX_TASK_ATTEMPTS = 3
+WORKER_WAIT_TIMEOUT = 60.0
+
+class WorkerLost(Exception):
+    pass
+
+def parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+def default_authkey():
+    return os.environ.get("GA_BROKER_AUTHKEY", "").encode() or None
+
+class _Batch:
+    # One map() call: results fill in as chunks complete, in any order
+    def __init__(self, size):
+        self.results = [None] * size
+        self.remaining = size
+        self._lock = threading.Lock()
+        self.error = None
+        self.done = threading.Event()
+        if size == 0:
+            self.done.set()
+
+    def complete(self, index, result):
+        with self._lock:
+            if self.done.is_set() or self.results[index] is not None:
+                return
+            self.results[index] = result
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.done.set()
+
+    def fail(self, error):
+        with self._lock:
+            if self.done.is_set():
+                return
+            self.error = error
+            self.done.set()
+
+class _Task:
+    def __init__(self, batch, index, function_id, chunk, is_batch, seed):
+        self.id = uuid.uuid4().hex
+        self.batch = batch
+        self.index = index
+        self.function_id = function_id
+        self.chunk = chunk
+        self.is_batch = is_batch
+        self.seed = seed
+        self.attempts = 0
+
+class Broker:
+    def __init__(self, address=("127.0.0.1", 0), authkey=None, heartbeat_timeout=HEARTBEAT_TIMEOUT,
+                 worker_wait=WORKER_WAIT_TIMEOUT):
+        self.authkey = authkey or os.urandom(16)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.worker_wait = worker_wait
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address = self._listener.address
+        self._tasks = queue.Queue()
+        self._functions = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self.workers = {}
+        self.stats = {"dispatched": 0, "redispatched": 0, "lost_workers": 0, "respawned_workers": 0}
+
+    def start(self):
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed.is_set():
+                    return
+                continue  # failed handshake, e.g. wrong authkey
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def register(self, fitness):
+        # Id for a fitness function, pickled once here so unpicklable functions fail early
+        function_id = uuid.uuid4().hex
+        with self._lock:
+            self._functions[function_id] = pickle.dumps(fitness)
+        return function_id
+
+    def unregister(self, function_id):
+        with self._lock:
+            self._functions.pop(function_id, None)
+
+    def map(self, function_id, chunks, batch=False, seeds=None, timeout=None):
+        # Results of the registered function for every chunk, in order; seeds gives each
+        # chunk its random stream (see rng.py), so re-dispatched chunks replay the same draws
+        job = _Batch(len(chunks))
+        seeds = seeds if seeds is not None else [None] * len(chunks)
+        for i, (chunk, seed) in enumerate(zip(chunks, seeds)):
+            self._tasks.put(_Task(job, i, function_id, chunk, batch, seed))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        idle_since = None
+        while not job.done.wait(POLL_INTERVAL):
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                job.fail("timed out")
+            with self._lock:
+                connected = bool(self.workers)
+            if connected:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = now
+            elif now - idle_since >= self.worker_wait:
+                job.fail(f"no workers connected for {self.worker_wait:.0f}s")
+        if job.error is not None:
+            raise RuntimeError(f"Distributed evaluation failed: {job.error}")
+        return job.results
+
+    def _serve(self, conn):
+        try:
+            kind, name = conn.recv()
+        except (EOFError, OSError, ValueError):
+            conn.close()
+            return
+        with self._lock:
+            self.workers[name] = {"tasks": 0}
+        task = None
+        try:
+            while not self._closed.is_set():
+                try:
+                    task = self._tasks.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    task = None
+                    self._drain_heartbeats(conn)
+                    continue
+                if task.batch.done.is_set():
+                    continue  # the map() call already failed or finished
+                self._dispatch(conn, task)
+                task = None
+                with self._lock:
+                    self.workers[name]["tasks"] += 1
+        except (WorkerLost, EOFError, OSError):
+            with self._lock:
+                self.stats["lost_workers"] += 1
+            if task is not None and not task.batch.done.is_set():
+                task.attempts += 1
+                if task.attempts >= MAX_TASK_ATTEMPTS:
+                    task.batch.fail(f"chunk {task.index} lost {task.attempts} workers")
+                else:
+                    with self._lock:
+                        self.stats["redispatched"] += 1
+                    self._tasks.put(task)
+        finally:
+            with self._lock:
+                self.workers.pop(name, None)
+            conn.close()
+
+    def _drain_heartbeats(self, conn):
+        # Idle workers keep sending heartbeats; read them so a dead connection is noticed
+        while conn.poll():
+            conn.recv()
+
+    def _dispatch(self, conn, task):
+        message = ("task", task.id, task.function_id, task.chunk, task.is_batch, task.seed)
+        conn.send(message)
+        with self._lock:
+            self.stats["dispatched"] += 1
+        while True:
+            if not conn.poll(self.heartbeat_timeout):
+                raise WorkerLost(task.id)
+            reply = conn.recv()
+            kind = reply[0]
+            if kind == "heartbeat":
+                continue
+            if kind == "missing":
+                # Worker hasn't seen (or has evicted) this function: send it, then the task again
+                with self._lock:
+                    function = self._functions.get(task.function_id)
+                if function is None:
+                    task.batch.fail("fitness function was unregistered")
+                    return
+                conn.send(("function", task.function_id, function))
+                conn.send(message)
+            elif kind == "result":
+                task.batch.complete(task.index, reply[2])
+                return
+            elif kind == "error":
+                task.batch.fail(reply[2])
+                return
+
+    def info(self):
+        with self._lock:
+            return dict(self.stats, address=list(self.address), workers=dict(self.workers))
+
+    def close(self):
+        self._closed.set()
+        self._listener.close()
+
+def _evaluate(fitness, chunk, is_batch, seed):
+    with rng.use(rng.make(seed)):
+        if is_batch:
+            return np.asarray(fitness(chunk))
+        return [fitness(ind) for ind in chunk]
+
+def run_worker(address, authkey=None, name=None, heartbeat_interval=HEARTBEAT_INTERVAL):
+    # Worker loop: evaluate chunks from the broker at address until it disconnects
+    conn = Client(tuple(address), authkey=authkey or default_authkey())
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    # Forked workers share the parent's global RNG state; reseed it for fitness functions that still
+    # draw from random / np.random directly (e.g. custom problems) rather than rng.get()
+    random.seed()
+    np.random.seed()
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(heartbeat_interval):
+            try:
+                send(("heartbeat",))
+            except OSError:
+                return
+
+    send(("hello", name or f"{socket.gethostname()}:{os.getpid()}"))
+    threading.Thread(target=heartbeat, daemon=True).start()
+    functions = OrderedDict()
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == "function":
+                functions[message[1]] = pickle.loads(message[2])
+                if len(functions) > MAX_WORKER_FUNCTIONS:
+                    functions.popitem(last=False)
+            elif message[0] == "task":
+                _, task_id, function_id, chunk, is_batch, seed = message
+                if function_id not in functions:
+                    send(("missing", task_id, function_id))
+                    continue
+                functions.move_to_end(function_id)
+                try:
+                    send(("result", task_id, _evaluate(functions[function_id], chunk, is_batch, seed)))
+                except Exception:
+                    send(("error", task_id, traceback.format_exc()))
+    except (EOFError, OSError):
+        pass
+    finally:
+        stop.set()
+        conn.close()
+
+class LocalCluster:
+    # A broker on localhost plus worker processes connected to it; workers that die
+    # (e.g. killed by the OOM killer) are replaced
+    def __init__(self, workers=2, heartbeat_timeout=HEARTBEAT_TIMEOUT):
+        from evaluators import _process_context
+        self.broker = Broker(heartbeat_timeout=heartbeat_timeout).start()
+        self._ctx = _process_context()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self.processes = [self._start_worker() for _ in range(workers)]
+        threading.Thread(target=self._supervise, daemon=True).start()
+
+    def _start_worker(self):
+        process = self._ctx.Process(target=run_worker, args=(self.broker.address, self.broker.authkey), daemon=True)
+        process.start()
+        return process
+
+    def _supervise(self):
+        while not self._closed.wait(POLL_INTERVAL):
+            with self._lock:
+                if self._closed.is_set():
+                    return
+                for i, process in enumerate(self.processes):
+                    if not process.is_alive():
+                        process.join()
+                        self.processes[i] = self._start_worker()
+                        with self.broker._lock:
+                            self.broker.stats["respawned_workers"] += 1
+
+    def close(self):
+        with self._lock:
+            self._closed.set()
+        self.broker.close()
+        for process in self.processes:
+            process.terminate()
+            process.join()
+
+class DistributedPool:
+    # The pool FitnessEvaluator uses for executor="distributed"
+    def __init__(self, broker, fitness, batch):
+        self.broker = broker
+        self.batch = batch
+        self.function_id = broker.register(fitness)
+
+    def map(self, chunks, seeds=None):
+        return self.broker.map(self.function_id, chunks, self.batch, seeds)
+
+    def shutdown(self):
+        self.broker.unregister(self.function_id)
+
+_broker = None
+_cluster = None
+_broker_lock = threading.Lock()
+
+def get_broker(local_workers=None):
+    # The process-wide broker, shared by all runs
+    global _broker, _cluster
+    with _broker_lock:
+        if _broker is None:
+            address = os.environ.get("GA_BROKER_ADDRESS")
+            if address:
+                if default_authkey() is None:
+                    raise RuntimeError("GA_BROKER_AUTHKEY must be set when GA_BROKER_ADDRESS is")
+                _broker = Broker(parse_address(address), authkey=default_authkey()).start()
+            else:
+                _cluster = LocalCluster(local_workers or os.cpu_count() or 1)
+                _broker = _cluster.broker
+        return _broker
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed GA fitness worker")
+    parser.add_argument("role", choices=["worker"])
+    parser.add_argument("--address", default=os.environ.get("GA_BROKER_ADDRESS", "127.0.0.1:6000"))
+    parser.add_argument("--name")
+    args = parser.parse_args()
+    run_worker(parse_address(args.address), name=args.name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import random
+import multiprocessing
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import distributed
+import rng
+
+EXECUTORS = ("serial", "thread", "process", "distributed")
+
+# Set in each pool process by _init_worker. With the fork start method the
+# fitness function is inherited rather than pickled, so closures over problem
+# data (e.g. the cities of a TSP run) work without changes.
+_worker_fitness = None
+
+def _init_worker(fitness):
+    global _worker_fitness
+    _worker_fitness = fitness
+    # Forked workers share the parent's global RNG state; reseed it for fitness functions that still
+    # draw from random / np.random directly (e.g. custom problems) rather than rng.get()
+    random.seed()
+    np.random.seed()
+
+def evaluate_chunk(fitness, chunk, batch, seed):
+    # Each chunk draws from its own stream, so stochastic fitness doesn't depend on which worker ran it
+    with rng.use(rng.make(seed)):
+        if batch:
+            return np.asarray(fitness(chunk))
+        return [fitness(ind) for ind in chunk]
+
+def _evaluate_worker_chunk(chunk, batch, seed):
+    return evaluate_chunk(_worker_fitness, chunk, batch, seed)
+
+def _process_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+class FitnessEvaluator:
+    def __init__(self, fitness, executor="serial", workers=None, chunksize=None, batch=False, seed=None):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {', '.join(EXECUTORS)}")
+        self.fitness = fitness
+        self.executor = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.batch = batch
+        # Chunk streams are spawned from this in order, so a seeded run replays with the same chunking
+        self.seed = rng.sequence(seed)
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.executor == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+            elif self.executor == "distributed":
+                # Socket workers behind the shared broker (see distributed.py)
+                self._pool = distributed.DistributedPool(distributed.get_broker(self.workers), self.fitness, self.batch)
+            else:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=_process_context(),
+                    initializer=_init_worker,
+                    initargs=(self.fitness,),
+                )
+        return self._pool
+
+    def _chunks(self, population):
+        # Default to ~4 chunks per worker so stragglers don't stall a generation
+        size = self.chunksize or max(1, -(-len(population) // (self.workers * 4)))
+        return [population[i:i + size] for i in range(0, len(population), size)]
+
+    def evaluate(self, population):
+        if self.executor == "serial" or len(population) < 2:
+            if self.batch:
+                return np.asarray(self.fitness(population))
+            return [self.fitness(ind) for ind in population]
+
+        chunks = self._chunks(population)
+        seeds = self.seed.spawn(len(chunks))
+        pool = self._get_pool()
+        if self.executor == "thread":
+            results = pool.map(evaluate_chunk, repeat(self.fitness), chunks, repeat(self.batch), seeds)
+        elif self.executor == "distributed":
+            results = pool.map(chunks, seeds)
+        else:
+            results = pool.map(_evaluate_worker_chunk, chunks, repeat(self.batch), seeds)
+
+        if self.batch:
+            return np.concatenate(list(results))
+        return [score for chunk in results for score in chunk]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
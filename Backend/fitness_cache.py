@@ -0,0 +1,89 @@
+from collections import OrderedDict
+import numpy as np
+
+def genome_key(genome):
+    if isinstance(genome, np.ndarray):
+        return genome.tobytes()
+    if isinstance(genome, (list, tuple)):
+        key = tuple(genome)
+        try:
+            hash(key)
+        except TypeError:
+            key = tuple(genome_key(g) for g in genome)
+        return key
+    return genome
+
+class FitnessCache:
+    # Bounded LRU map from genome to fitness.
+    # With resample=True every lookup still calls the fitness function and the
+    # cache keeps a running mean per genome, which suits noisy fitness functions.
+    def __init__(self, maxsize=10000, resample=False):
+        self.maxsize = maxsize
+        self.resample = resample
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+
+    def _put(self, key, value):
+        self._store[key] = value
+        self._store.move_to_end(key)
+        if len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+
+    def _subset(self, population, indices):
+        if isinstance(population, np.ndarray):
+            return population[indices]
+        return [population[i] for i in indices]
+
+    def evaluate(self, population, evaluate):
+        keys = [genome_key(ind) for ind in population]
+        if self.resample:
+            return self._evaluate_resampled(population, keys, evaluate)
+
+        scores = [None] * len(keys)
+        pending = {}
+        for i, key in enumerate(keys):
+            if key in self._store:
+                self._store.move_to_end(key)
+                scores[i] = self._store[key]
+                self.hits += 1
+            elif key in pending:
+                # Duplicate child within this generation, scored once below
+                pending[key].append(i)
+                self.hits += 1
+            else:
+                pending[key] = [i]
+                self.misses += 1
+
+        if pending:
+            first = [positions[0] for positions in pending.values()]
+            fresh = evaluate(self._subset(population, first))
+            for (key, positions), score in zip(pending.items(), fresh):
+                self._put(key, score)
+                for i in positions:
+                    scores[i] = score
+        return scores
+
+    def _evaluate_resampled(self, population, keys, evaluate):
+        samples = evaluate(population)
+        scores = []
+        for key, sample in zip(keys, samples):
+            if key in self._store:
+                mean, count = self._store[key]
+                mean, count = mean + (sample - mean) / (count + 1), count + 1
+                self.hits += 1
+            else:
+                mean, count = sample, 1
+                self.misses += 1
+            self._put(key, (mean, count))
+            scores.append(mean)
+        return scores
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._store),
+            "maxsize": self.maxsize,
+            "resample": self.resample,
+        }
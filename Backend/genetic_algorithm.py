@@ -1,7 +1,72 @@
-import random
+import numpy as np
+import rng
+from evaluators import FitnessEvaluator
+from fitness_cache import FitnessCache
+from selection import get_selection, top_k
+from termination import Termination, termination_options
+from profiling import Profiler
+
+# With delta fitness, the share of children bred by crossover when crossover_rate isn't
+# given; the rest are mutated copies of their first parent and scored incrementally
+DELTA_CROSSOVER_RATE = 0.7
+
+CACHE_FLAGS = {"true": True, "1": True, "yes": True, "on": True, "false": False, "0": False, "no": False, "off": False}
+
+def cache_option(value):
+    # The cache setting from a request param: a flag, or "resample"
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value == "resample":
+            return value
+        if value not in CACHE_FLAGS:
+            raise ValueError(f"Unknown cache setting '{value}', expected true, false or resample")
+        return CACHE_FLAGS[value]
+    return bool(value)
+
+def engine_options(params):
+    # Engine settings that any problem can accept straight from the request params
+    options = {"executor": params.get("executor", "serial")}
+    if params.get("workers"):
+        options["workers"] = int(params["workers"])
+    if params.get("chunksize"):
+        options["chunksize"] = int(params["chunksize"])
+    if params.get("selection"):
+        options["selection"] = params["selection"]
+    if params.get("tournament_size"):
+        options["tournament_size"] = int(params["tournament_size"])
+    if params.get("crossover_rate") not in (None, ""):
+        options["crossover_rate"] = float(params["crossover_rate"])
+    if params.get("cache") not in (None, ""):
+        options["cache"] = cache_option(params["cache"])
+    if params.get("seed") not in (None, ""):
+        options["seed"] = int(params["seed"])
+    options.update(termination_options(params))
+    if params.get("profile_allocations"):
+        options["profile_allocations"] = True
+    return options
+
+def generation_stats(generation, generations, scores, best_so_far, maximize=True):
+    # Progress record passed to on_generation callbacks
+    scores = np.asarray(scores, dtype=float)
+    best, worst = (scores.max(), scores.min()) if maximize else (scores.min(), scores.max())
+    return {
+        "generation": generation,
+        "generations": generations,
+        "best": float(best),
+        "mean": float(scores.mean()),
+        "worst": float(worst),
+        "best_so_far": float(best_so_far),
+    }
 
 class GeneticAlgorithm:
-    def __init__(self, create_individual, fitness, breed, mutate, population_size=100, generations=100, mutation_rate=0.05):
+    def __init__(self, create_individual, fitness, breed, mutate, population_size=100, generations=100, mutation_rate=0.05,
+                 create_population=None, fitness_batch=None, breed_batch=None, mutate_batch=None,
+                 executor="serial", workers=None, chunksize=None, cache=None, cache_size=None,
+                 on_generation=None, migrate=None, selection="truncation", tournament_size=None,
+                 delta_fitness=None, delta_fitness_batch=None, mutate_tracked=None, mutate_batch_tracked=None,
+                 crossover_rate=None, seed=None,
+                 target=None, patience=None, time_limit=None, max_evaluations=None, min_diversity=None,
+                 profile_allocations=False):
         self.create_individual = create_individual
         self.fitness = fitness
         self.breed = breed
@@ -9,35 +74,293 @@ class GeneticAlgorithm:
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
+        # Array engine: the population is a 2-D array and these operate on all rows at once
+        self.create_population = create_population
+        self.fitness_batch = fitness_batch
+        self.breed_batch = breed_batch
+        self.mutate_batch = mutate_batch
+        # Fitness evaluation backend: "serial", "thread" or "process"
+        self.executor = executor
+        self.workers = workers
+        self.chunksize = chunksize
+        # Fitness cache: True memoizes, "resample" re-evaluates and averages (noisy fitness), False disables.
+        # None memoizes for the list engine only: hashing every row costs far more than a fitness_batch call.
+        self.cache = cache
+        self.cache_size = cache_size
+        # Called with generation_stats() after every generation; returning False stops the run
+        self.on_generation = on_generation
+        # Called as migrate(generation, population, scores) after evaluation and returns
+        # (population, scores), e.g. with immigrants from other islands swapped in
+        self.migrate = migrate
+        # Parent selection: a name from selection.SELECTIONS or a callable(scores, count) -> indices
+        self.selection = selection
+        self.tournament_size = tournament_size
+        # Incremental fitness for children that skipped crossover, from their parent's score and
+        # the genes mutation changed: delta_fitness(parent_score, parent, changed_positions, child)
+        # for list genomes, delta_fitness_batch(parent_scores, parents, (rows, positions), children)
+        # for the array engine. The changes come from mutate_tracked(individual, rate) ->
+        # (child, changed_positions) and mutate_batch_tracked(population, rate) ->
+        # (children, (rows, positions)), used in place of mutate/mutate_batch. Positions may repeat.
+        # Survivors then keep their scores instead of being re-evaluated.
+        if delta_fitness is not None and mutate_tracked is None:
+            raise ValueError("delta_fitness needs mutate_tracked to report the changed positions")
+        if delta_fitness_batch is not None and mutate_batch_tracked is None:
+            raise ValueError("delta_fitness_batch needs mutate_batch_tracked to report the changed positions")
+        self.delta_fitness = delta_fitness
+        self.delta_fitness_batch = delta_fitness_batch
+        self.mutate_tracked = mutate_tracked
+        self.mutate_batch_tracked = mutate_batch_tracked
+        # Probability that a pair of parents is crossed; None crosses every pair, or
+        # DELTA_CROSSOVER_RATE of them when delta fitness is available
+        self.crossover_rate = crossover_rate
+        # Seed of the run's random stream (an int or a SeedSequence, see rng.py); None draws fresh entropy
+        self.seed = seed
+        # Early stopping, see termination.py
+        self.termination = Termination(target, patience, time_limit, max_evaluations, min_diversity)
+        # Per-phase timings always go to stats["profile"]; allocation tracking is opt-in (see profiling.py)
+        self.profile_allocations = profile_allocations
         self.history = []
+        self.stats = {}
 
     def run(self):
-        population = [self.create_individual() for _ in range(self.population_size)]
+        batch = self.fitness_batch is not None
+        # One stream for the run itself, another that parallel evaluation splits per chunk
+        run_seed, evaluation_seed = rng.spawn(self.seed, 2)
+        evaluator = FitnessEvaluator(
+            self.fitness_batch if batch else self.fitness,
+            executor=self.executor,
+            workers=self.workers,
+            chunksize=self.chunksize,
+            batch=batch,
+            seed=evaluation_seed,
+        )
+        self._selection = get_selection(self.selection, self.tournament_size)
+        self._evaluations = 0
+        self.termination.start()
+        self._profiler = Profiler(allocations=self.profile_allocations)
+        self._profiler.start()
+        self._cache = None
+        memoize = self.cache if self.cache is not None else not batch
+        if memoize:
+            # Default size keeps elites and recent children across a few generations
+            maxsize = self.cache_size or 4 * self.population_size
+            self._cache = FitnessCache(maxsize, resample=self.cache == "resample")
+        with rng.use(rng.make(run_seed)), evaluator:
+            if batch:
+                result = self._run_batch(evaluator)
+            else:
+                result = self._run_list(evaluator)
+        self._profiler.stop()
+        if self._cache is not None:
+            self.stats["cache"] = self._cache.info()
+        self.stats.setdefault("stop_reason", "generations")
+        self.stats["generations_run"] = len(self.history)
+        self.stats["evaluations"] = self._evaluations
+        self.stats["profile"] = self._profiler.summary()
+        return result
+
+    def _report(self, gen, scores, best_score):
+        # True when the callback asks to stop
+        if self.on_generation is None:
+            return False
+        return self.on_generation(generation_stats(gen + 1, self.generations, scores, best_score)) is False
+
+    def _should_stop(self, gen, scores, best_score, population):
+        # True (with stats["stop_reason"] set) when the run ends after this generation
+        if self._report(gen, scores, best_score):
+            reason = "callback"
+        else:
+            reason = self.termination.check(best_score, population, self._evaluations)
+        if reason is not None:
+            self.stats["stop_reason"] = reason
+        return reason is not None
+
+    def _evaluate_uncached(self, evaluator, population):
+        self._evaluations += len(population)
+        return evaluator.evaluate(population)
+
+    def _evaluate(self, evaluator, population):
+        if self._cache is None:
+            return self._evaluate_uncached(evaluator, population)
+        return self._cache.evaluate(population, lambda pending: self._evaluate_uncached(evaluator, pending))
+
+    def _count_evaluations(self, delta, full):
+        self.stats["delta_evaluations"] = self.stats.get("delta_evaluations", 0) + delta
+        self.stats["full_evaluations"] = self.stats.get("full_evaluations", 0) + full
+        self._evaluations += delta
+
+    def _crossed(self, count, delta):
+        # Which parent pairs are crossed; the others pass their first parent on to mutation alone
+        rate = self.crossover_rate
+        if rate is None:
+            rate = DELTA_CROSSOVER_RATE if delta else 1.0
+        if rate >= 1:
+            return np.ones(count, dtype=bool)
+        return rng.get().random(count) < rate
+
+    def _score_children(self, evaluator, parents, parent_scores, children, changed, crossed):
+        # List engine: mutation-only children go through delta_fitness, crossed ones in full
+        scores = [None] * len(children)
+        full = np.flatnonzero(crossed).tolist()
+        for i in np.flatnonzero(~crossed).tolist():
+            scores[i] = self.delta_fitness(parent_scores[i], parents[i], changed[i], children[i])
+        if full:
+            for i, score in zip(full, self._evaluate(evaluator, [children[i] for i in full])):
+                scores[i] = score
+        self._count_evaluations(len(children) - len(full), len(full))
+        return scores
+
+    def _score_children_batch(self, evaluator, parents, parent_scores, children, changed, crossed):
+        local = ~crossed
+        scores = np.empty(len(children), dtype=parent_scores.dtype)
+        if local.any():
+            rows, positions = changed
+            keep = local[rows]
+            # Renumber the changed rows within the mutation-only children
+            index = np.cumsum(local) - 1
+            scores[local] = self.delta_fitness_batch(
+                parent_scores[local], parents[local], (index[rows[keep]], positions[keep]), children[local])
+        if crossed.any():
+            scores[crossed] = self._evaluate(evaluator, children[crossed])
+        self._count_evaluations(int(local.sum()), int(crossed.sum()))
+        return scores
+
+    def _run_list(self, evaluator):
+        phase = self._profiler.phase
+        delta = self.delta_fitness is not None
+        with phase("initialization"):
+            population = [self.create_individual() for _ in range(self.population_size)]
+        scores = None
         best_solution = None
         best_score = float('-inf')
+        n_survivors = max(1, self.population_size // 5)
+        n_children = self.population_size - n_survivors
 
         for gen in range(self.generations):
-            scored_population = [(ind, self.fitness(ind)) for ind in population]
-            scored_population.sort(key=lambda x: x[1], reverse=True)
-            best_in_gen = scored_population[0]
-            self.history.append(best_in_gen[1])
-
-            if best_in_gen[1] > best_score:
-                best_score = best_in_gen[1]
-                best_solution = best_in_gen[0]
-
-            # Selection: top 20% survive
-            survivors = [ind for ind, _ in scored_population[:self.population_size // 5]]
-
-            # Breeding
-            children = []
-            while len(children) < self.population_size - len(survivors):
-                parent1 = random.choice(survivors)
-                parent2 = random.choice(survivors)
-                child = self.breed(parent1, parent2)
-                child = self.mutate(child, self.mutation_rate)
-                children.append(child)
+            if scores is None:
+                with phase("evaluation"):
+                    scores = self._evaluate(evaluator, population)
+            if self.migrate is not None:
+                with phase("migration"):
+                    population, scores = self.migrate(gen, population, scores)
+            fitness = np.asarray(scores, dtype=float)
+            best_index = int(fitness.argmax())
+            self.history.append(scores[best_index])
+
+            if scores[best_index] > best_score:
+                best_score = scores[best_index]
+                best_solution = population[best_index]
 
+            with phase("reporting"):
+                stop = self._should_stop(gen, scores, best_score, population)
+            if stop:
+                self._profiler.end_generation()
+                break
+
+            with phase("selection"):
+                # Elitism: the top 20% survive unchanged
+                elite = top_k(fitness, n_survivors)
+                survivors = [population[i] for i in elite]
+                parents1 = self._selection(fitness, n_children)
+                parents2 = self._selection(fitness, n_children)
+
+            with phase("breeding"):
+                crossed = self._crossed(n_children, delta)
+                children = [self.breed(population[i], population[j]) if cross else population[i]
+                            for i, j, cross in zip(parents1, parents2, crossed.tolist())]
+            with phase("mutation"):
+                if delta:
+                    mutated = [self.mutate_tracked(child, self.mutation_rate) for child in children]
+                    children = [child for child, _ in mutated]
+                    changed = [positions for _, positions in mutated]
+                else:
+                    children = [self.mutate(child, self.mutation_rate) for child in children]
+
+            if delta:
+                with phase("evaluation"):
+                    scores = [scores[i] for i in elite] + self._score_children(
+                        evaluator, [population[i] for i in parents1], [scores[i] for i in parents1],
+                        children, changed, crossed)
+            else:
+                scores = None
             population = survivors + children
+            self._profiler.end_generation()
+
+        return best_solution, best_score, self.history
+
+    def _breed_batch(self, parents1, parents2):
+        if self.breed_batch is not None:
+            return self.breed_batch(parents1, parents2)
+        return np.array([self.breed(p1, p2) for p1, p2 in zip(parents1.tolist(), parents2.tolist())])
+
+    def _run_batch(self, evaluator):
+        phase = self._profiler.phase
+        delta = self.delta_fitness_batch is not None
+        with phase("initialization"):
+            if self.create_population is not None:
+                population = np.asarray(self.create_population(self.population_size))
+            else:
+                population = np.array([self.create_individual() for _ in range(self.population_size)])
+        scores = None
+        best_solution = None
+        best_score = float('-inf')
+        n_survivors = max(1, self.population_size // 5)
+        n_children = self.population_size - n_survivors
+
+        for gen in range(self.generations):
+            if scores is None:
+                with phase("evaluation"):
+                    scores = np.asarray(self._evaluate(evaluator, population))
+            if self.migrate is not None:
+                with phase("migration"):
+                    population, scores = self.migrate(gen, population, scores)
+            best_index = int(scores.argmax())
+            gen_best = scores[best_index].item()
+            self.history.append(gen_best)
+
+            if gen_best > best_score:
+                best_score = gen_best
+                best_solution = population[best_index].tolist()
+
+            with phase("reporting"):
+                stop = self._should_stop(gen, scores, best_score, population)
+            if stop:
+                self._profiler.end_generation()
+                break
+
+            with phase("selection"):
+                # Elitism: the top 20% survive unchanged
+                elite = top_k(scores, n_survivors)
+                survivors = population[elite]
+                # Parents drawn with replacement by the selection strategy
+                chosen = self._selection(scores, n_children)
+                parents1 = population[chosen]
+                parents2 = population[self._selection(scores, n_children)]
+
+            with phase("breeding"):
+                crossed = self._crossed(n_children, delta)
+                if crossed.all():
+                    children = self._breed_batch(parents1, parents2)
+                else:
+                    children = parents1.copy()
+                    if crossed.any():
+                        children[crossed] = self._breed_batch(parents1[crossed], parents2[crossed])
+            with phase("mutation"):
+                if delta:
+                    children, changed = self.mutate_batch_tracked(children, self.mutation_rate)
+                elif self.mutate_batch is not None:
+                    children = self.mutate_batch(children, self.mutation_rate)
+                else:
+                    children = np.array([self.mutate(child, self.mutation_rate) for child in children.tolist()])
+                children = children.astype(population.dtype, copy=False)
+
+            if delta:
+                with phase("evaluation"):
+                    scores = np.concatenate([scores[elite], self._score_children_batch(
+                        evaluator, parents1, scores[chosen], children, changed, crossed)])
+            else:
+                scores = None
+            population = np.concatenate([survivors, children])
+            self._profiler.end_generation()
 
-        return best_solution, best_score, self.history
\ No newline at end of file
+        return best_solution, best_score, self.history
@@ -0,0 +1,237 @@
+import queue
+import threading
+import traceback
+from types import SimpleNamespace
+import numpy as np
+import rng
+from evaluators import _process_context
+from genetic_algorithm import GeneticAlgorithm, engine_options
+from selection import top_k, bottom_k
+from termination import STOP_REASONS, GLOBAL_STOP_REASONS
+from profiling import merge_profiles
+
+TOPOLOGIES = ("ring", "full", "random")
+ISLAND_EXECUTORS = ("process", "thread")
+MIN_ISLAND_SIZE = 5
+POLL_INTERVAL = 1.0
+
+# Island model: the population is split into subpopulations that each run their own
+# GeneticAlgorithm (one process per island by default) and every migration_interval
+# generations send copies of their best individuals to neighbouring islands, where
+# they replace the worst. Migration is asynchronous: an island takes whatever has
+# arrived in its inbox, so a slow island never blocks the others. Arrivals depend on
+# timing, so a seeded multi-island run does not replay exactly, though each island's
+# own random stream does.
+
+def island_options(params):
+    # Island settings that any problem can accept straight from the request params
+    options = {"islands": int(params.get("islands") or 1)}
+    for name in ("migration_interval", "migrants"):
+        if params.get(name):
+            options[name] = int(params[name])
+    if params.get("topology"):
+        options["topology"] = params["topology"]
+    return options
+
+def make_ga(params, **ga_kwargs):
+    # GeneticAlgorithm, or an IslandModel of them when the params ask for more than one island
+    options = island_options(params)
+    ga_kwargs.update(engine_options(params))
+    if options["islands"] > 1:
+        return IslandModel(**options, **ga_kwargs)
+    return GeneticAlgorithm(**ga_kwargs)
+
+def migration_targets(topology, index, islands):
+    others = [i for i in range(islands) if i != index]
+    if topology == "ring":
+        return [(index + 1) % islands]
+    if topology == "full":
+        return others
+    return [others[rng.get().integers(len(others))]]
+
+def _drain(inbox):
+    items = []
+    while True:
+        try:
+            items.append(inbox.get_nowait())
+        except queue.Empty:
+            return items
+
+class Migration:
+    # The migrate hook installed on each island's GeneticAlgorithm
+    def __init__(self, index, islands, inboxes, topology, interval, migrants):
+        self.index = index
+        self.islands = islands
+        self.inboxes = inboxes
+        self.topology = topology
+        self.interval = interval
+        self.migrants = migrants
+        self.sent = 0
+        self.received = 0
+
+    def __call__(self, gen, population, scores):
+        if (gen + 1) % self.interval:
+            return population, scores
+        best = top_k(scores, self.migrants)
+        emigrants = [(np.copy(population[i]) if isinstance(population, np.ndarray) else population[i], scores[i])
+                     for i in best]
+        for target in migration_targets(self.topology, self.index, self.islands):
+            self.inboxes[target].put(emigrants)
+            self.sent += len(emigrants)
+
+        immigrants = [ind for batch in _drain(self.inboxes[self.index]) for ind in batch]
+        # Keep the island's size fixed: newest arrivals replace the worst individuals
+        immigrants = immigrants[-(len(scores) - len(best)):] if len(scores) > len(best) else []
+        if not immigrants:
+            return population, scores
+        self.received += len(immigrants)
+        worst = bottom_k(scores, len(immigrants))
+        if isinstance(population, np.ndarray):
+            population = population.copy()
+            scores = np.asarray(scores).copy()
+            population[worst] = np.array([ind for ind, _ in immigrants]).astype(population.dtype, copy=False)
+            scores[worst] = [score for _, score in immigrants]
+        else:
+            population, scores = list(population), list(scores)
+            for i, (ind, score) in zip(worst, immigrants):
+                population[i], scores[i] = ind, score
+        return population, scores
+
+def _run_island(index, ga_kwargs, inboxes, outbox, stop, topology, interval, migrants, seed):
+    # Island entry point (process or thread); everything goes back to the parent through outbox.
+    # seed is this island's SeedSequence, spawned from the model's seed.
+    try:
+        migration = Migration(index, len(inboxes), inboxes, topology, interval, migrants)
+
+        def report(info):
+            outbox.put(("progress", index, info))
+            return not stop.is_set()
+
+        ga = GeneticAlgorithm(**ga_kwargs, on_generation=report, migrate=migration, seed=seed)
+        best, score, history = ga.run()
+        ga.stats["migrants_sent"] = migration.sent
+        ga.stats["migrants_received"] = migration.received
+        outbox.put(("result", index, (best, score, history, ga.stats)))
+    except Exception:
+        outbox.put(("error", index, traceback.format_exc()))
+
+class IslandModel:
+    def __init__(self, islands=4, migration_interval=10, migrants=2, topology="ring", island_executor="process",
+                 seed=None, on_generation=None, **ga_kwargs):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology '{topology}', expected one of {', '.join(TOPOLOGIES)}")
+        if island_executor not in ISLAND_EXECUTORS:
+            raise ValueError(f"Unknown island executor '{island_executor}', expected one of {', '.join(ISLAND_EXECUTORS)}")
+        self.islands = islands
+        self.migration_interval = max(1, migration_interval)
+        self.migrants = migrants
+        self.topology = topology
+        self.island_executor = island_executor
+        self.seed = seed
+        self.on_generation = on_generation
+        # Everything else goes to each island's GeneticAlgorithm; the population is split between islands
+        self.generations = ga_kwargs.get("generations", 100)
+        population_size = ga_kwargs.pop("population_size", 100)
+        ga_kwargs["population_size"] = max(MIN_ISLAND_SIZE, population_size // islands)
+        self.ga_kwargs = ga_kwargs
+        self.history = []
+        self.stats = {}
+
+    def _context(self):
+        if self.island_executor == "thread":
+            return SimpleNamespace(Queue=queue.Queue, Event=threading.Event, Process=threading.Thread)
+        return _process_context()
+
+    def run(self):
+        ctx = self._context()
+        inboxes = [ctx.Queue() for _ in range(self.islands)]
+        outbox = ctx.Queue()
+        stop = ctx.Event()
+        seeds = rng.spawn(self.seed, self.islands)
+        workers = [
+            ctx.Process(
+                target=_run_island,
+                args=(i, self.ga_kwargs, inboxes, outbox, stop, self.topology,
+                      self.migration_interval, self.migrants, seeds[i]),
+                # Island processes may start their own evaluation workers ("process" or
+                # "distributed" executors), which daemonic processes can't; they are joined below
+                daemon=self.island_executor == "thread",
+            )
+            for i in range(self.islands)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            results = self._collect(outbox, workers, stop)
+        finally:
+            stop.set()
+            # Migrants nobody picked up can keep a process from exiting until its queue is read
+            for worker in workers:
+                while worker.is_alive():
+                    for inbox in inboxes:
+                        _drain(inbox)
+                    worker.join(timeout=0.1)
+        return self._merge(results)
+
+    def _collect(self, outbox, workers, stop):
+        # Forward merged progress once every island has reported a generation, until all results are in
+        progress = {}
+        results = {}
+        while len(results) < self.islands:
+            try:
+                kind, index, payload = outbox.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError("Island workers exited without returning results")
+                continue
+            if kind == "error":
+                stop.set()
+                raise RuntimeError(f"Island {index} failed:\n{payload}")
+            if kind == "result":
+                results[index] = payload
+                if payload[3].get("stop_reason") in GLOBAL_STOP_REASONS:
+                    stop.set()
+                continue
+            reports = progress.setdefault(payload["generation"], [])
+            reports.append(payload)
+            if len(reports) == self.islands:
+                del progress[payload["generation"]]
+                if self._report(reports) is False:
+                    stop.set()
+        return [results[i] for i in range(self.islands)]
+
+    def _report(self, reports):
+        if self.on_generation is None:
+            return True
+        return self.on_generation({
+            "generation": reports[0]["generation"],
+            "generations": self.generations,
+            "best": max(r["best"] for r in reports),
+            "mean": sum(r["mean"] for r in reports) / len(reports),
+            "worst": min(r["worst"] for r in reports),
+            "best_so_far": max(r["best_so_far"] for r in reports),
+        })
+
+    def _merge(self, results):
+        # Same (best, score, history) shape as GeneticAlgorithm.run; history is the best across islands
+        winner = max(range(len(results)), key=lambda i: results[i][1])
+        best, score = results[winner][0], results[winner][1]
+        length = max(len(history) for _, _, history, _ in results)
+        self.history = [
+            max(history[g] for _, _, history, _ in results if g < len(history))
+            for g in range(length)
+        ]
+        island_stats = [stats for _, _, _, stats in results]
+        reasons = {stats.get("stop_reason") for stats in island_stats}
+        self.stats = {
+            "stop_reason": next((r for r in STOP_REASONS if r in reasons), "generations"),
+            "generations_run": length,
+            "evaluations": sum(stats.get("evaluations", 0) for stats in island_stats),
+            "profile": merge_profiles([stats.get("profile") for stats in island_stats]),
+            "islands": self.islands,
+            "topology": self.topology,
+            "migration_interval": self.migration_interval,
+            "best_island": winner,
+            "island_stats": island_stats,
+        }
+        return best, score, self.history
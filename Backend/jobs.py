@@ -0,0 +1,114 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class QueueFullError(Exception):
+    pass
+
+class Job:
+    def __init__(self, problem_id, params):
+        self.id = uuid.uuid4().hex
+        self.problem_id = problem_id
+        self.params = params
+        self.status = "queued"
+        self.progress = {}
+        self.events = []
+        self.cancelled = False
+        self._changed = threading.Condition()
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    def update_progress(self, info):
+        # Used as the on_generation callback; returning False asks the run to stop
+        with self._changed:
+            self.progress = dict(info)
+            self.events.append(self.progress)
+            self._changed.notify_all()
+        return not self.cancelled
+
+    def is_finished(self):
+        return self.status in ("done", "error", "cancelled")
+
+    def finish(self, status):
+        with self._changed:
+            self.status = status
+            self.finished = time.time()
+            self._changed.notify_all()
+
+    def wait_events(self, start, timeout=None):
+        # Progress events after index start, blocking until there is something new
+        with self._changed:
+            if len(self.events) <= start and not self.is_finished():
+                self._changed.wait(timeout)
+            return self.events[start:], self.is_finished()
+
+    def to_dict(self):
+        return {
+            "jobId": self.id,
+            "problemId": self.problem_id,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+class JobQueue:
+    # Runs GA jobs on a bounded thread pool so requests return immediately.
+    # At most max_pending jobs may wait for a worker; finished jobs beyond
+    # max_finished are forgotten oldest first.
+    def __init__(self, max_workers=4, max_pending=100, max_finished=500):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ga-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, problem_id, params, run):
+        job = Job(problem_id, params)
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j.status == "queued")
+            if pending >= self.max_pending:
+                raise QueueFullError("Too many queued jobs, try again later")
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, run)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None and not job.is_finished():
+            job.cancelled = True
+            if job.status == "queued":
+                job.finish("cancelled")
+        return job
+
+    def _run(self, job, run):
+        if job.cancelled:
+            return
+        job.status = "running"
+        job.started = time.time()
+        try:
+            job.result = run(job.problem_id, job.params, job.update_progress)
+        except Exception as e:
+            job.error = str(e)
+            job.finish("error")
+        else:
+            # A cancelled run stops early but keeps its partial result
+            job.finish("cancelled" if job.cancelled else "done")
+
+    def _prune(self):
+        finished = [j.id for j in self._jobs.values() if j.is_finished()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
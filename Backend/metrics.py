@@ -0,0 +1,57 @@
+import threading
+
+# Process-wide counters served by /api/metrics in the Prometheus text exposition format.
+# Finished runs feed them from their stats (see profiling.py for the phase timings).
+
+_lock = threading.Lock()
+_values = {}  # (metric, labels) -> value
+
+METRICS = {
+    "ga_runs_total": ("counter", "GA runs finished, by problem and stop reason"),
+    "ga_run_seconds_total": ("counter", "Wall time spent running problems"),
+    "ga_phase_seconds_total": ("counter", "Time spent in each phase of the GA loop"),
+    "ga_phase_calls_total": ("counter", "Times each phase of the GA loop ran"),
+    "ga_evaluations_total": ("counter", "Fitness evaluations performed"),
+    "ga_generations_total": ("counter", "Generations run"),
+    "ga_plot_renders_total": ("counter", "Plots drawn on first request"),
+    "ga_plot_render_seconds_total": ("counter", "Time spent drawing plots"),
+}
+
+def _add(metric, value, **labels):
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _values[key] = _values.get(key, 0) + value
+
+def record_run(problem_id, result, seconds):
+    stats = result.get("stats") if isinstance(result, dict) else None
+    stats = stats if isinstance(stats, dict) else {}
+    _add("ga_runs_total", 1, problem=problem_id, stop_reason=stats.get("stop_reason", "unknown"))
+    _add("ga_run_seconds_total", seconds, problem=problem_id)
+    if stats.get("evaluations") is not None:
+        _add("ga_evaluations_total", stats["evaluations"], problem=problem_id)
+    if stats.get("generations_run") is not None:
+        _add("ga_generations_total", stats["generations_run"], problem=problem_id)
+    for phase, timing in (stats.get("profile") or {}).get("phases", {}).items():
+        _add("ga_phase_seconds_total", timing["seconds"], problem=problem_id, phase=phase)
+        _add("ga_phase_calls_total", timing["calls"], problem=problem_id, phase=phase)
+
+def record_plot_render(seconds):
+    _add("ga_plot_renders_total", 1)
+    _add("ga_plot_render_seconds_total", seconds)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render():
+    with _lock:
+        values = dict(_values)
+    lines = []
+    for metric, (kind, description) in METRICS.items():
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (name, labels), value in sorted(values.items()):
+            if name != metric:
+                continue
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+            lines.append(f"{metric}{{{label_text}}} {value}" if labels else f"{metric} {value}")
+    return "\n".join(lines) + "\n"
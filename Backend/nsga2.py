@@ -0,0 +1,188 @@
+import numpy as np
+import rng
+from pareto_history import ParetoHistory
+from profiling import Profiler
+
+# Multi-objective counterpart to GeneticAlgorithm's array engine (NSGA-II).
+# Objectives are minimized; populations are 2-D arrays with one decision vector per row
+# and objective arrays have one row per individual, one column per objective.
+
+def dominance_ranks(objs):
+    # Front index of every row, 0 = non-dominated
+    objs = np.asarray(objs, dtype=float)
+    if len(objs) == 0:
+        return np.zeros(0, dtype=np.int64)
+    # Equal rows share a front, so rank the distinct rows in lexicographic order;
+    # then a row can only be dominated by rows before it
+    unique, inverse = np.unique(objs, axis=0, return_inverse=True)
+    if objs.shape[1] == 2:
+        ranks = _sweep_ranks(unique)
+    else:
+        ranks = _binary_search_ranks(unique)
+    return ranks[inverse.reshape(-1)]
+
+def _sweep_ranks(unique):
+    # Two objectives, O(N log N): a row is dominated by front k exactly when the lowest
+    # f2 seen in that front is <= its own f2, and those minima increase with k
+    front_min = np.empty(len(unique))
+    n_fronts = 0
+    ranks = np.empty(len(unique), dtype=np.int64)
+    for i, f2 in enumerate(unique[:, 1]):
+        k = int(np.searchsorted(front_min[:n_fronts], f2, side="right"))
+        front_min[k] = f2
+        n_fronts = max(n_fronts, k + 1)
+        ranks[i] = k
+    return ranks
+
+def _binary_search_ranks(unique):
+    # Any number of objectives (efficient non-dominated sort, binary search variant).
+    # If front k dominates a row so does every front before it, so the row's front
+    # is found in O(log fronts) vectorized checks against the fronts' members.
+    fronts = []  # [buffer, count] per front, buffers grow by doubling
+    ranks = np.empty(len(unique), dtype=np.int64)
+    for i, row in enumerate(unique):
+        lo, hi = 0, len(fronts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            members = fronts[mid][0][:fronts[mid][1]]
+            # Members are distinct and earlier in lexicographic order, so <= everywhere means dominates
+            if (members <= row).all(axis=1).any():
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(fronts):
+            fronts.append([np.empty((16, len(row))), 0])
+        front = fronts[lo]
+        if front[1] == len(front[0]):
+            front[0] = np.concatenate([front[0], np.empty_like(front[0])])
+        front[0][front[1]] = row
+        front[1] += 1
+        ranks[i] = lo
+    return ranks
+
+def crowding_distance(objs, ranks):
+    # Crowding distance within each front, all fronts at once; front ends get inf
+    objs = np.asarray(objs, dtype=float)
+    n = len(objs)
+    distance = np.zeros(n)
+    if n == 0:
+        return distance
+    for m in range(objs.shape[1]):
+        order = np.lexsort((objs[:, m], ranks))
+        values = objs[order, m]
+        front = ranks[order]
+        first = np.r_[True, front[1:] != front[:-1]]
+        last = np.r_[front[1:] != front[:-1], True]
+        span = np.repeat(values[last] - values[first], np.flatnonzero(last) - np.flatnonzero(first) + 1)
+        gap = np.zeros(n)
+        gap[1:-1] = values[2:] - values[:-2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            contribution = np.where(span > 0, gap / span, 0.0)
+        contribution[first | last] = np.inf
+        distance[order] += contribution
+    return distance
+
+def tournament(ranks, crowding, size):
+    # Binary tournament on (lower rank, then larger crowding distance)
+    a = rng.get().integers(0, len(ranks), size)
+    b = rng.get().integers(0, len(ranks), size)
+    a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] > crowding[b]))
+    return np.where(a_wins, a, b)
+
+def select(objs, size):
+    # Indices of the size best rows: whole fronts first, the last one cut by crowding
+    ranks = dominance_ranks(objs)
+    crowding = crowding_distance(objs, ranks)
+    order = np.lexsort((-crowding, ranks))[:size]
+    return order, ranks[order], crowding[order]
+
+class NSGA2:
+    def __init__(self, create_population, objectives, breed, mutate, population_size=100, generations=100,
+                 mutation_rate=0.1, bounds=None, reference=None, on_generation=None, seed=None):
+        # create_population(size) -> (size, dim) array; objectives(population) -> (size, n_objectives) array
+        self.create_population = create_population
+        self.objectives = objectives
+        # breed(parents1, parents2) and mutate(population, rate) work on whole arrays, like batch_ops
+        self.breed = breed
+        self.mutate = mutate
+        self.population_size = population_size
+        self.generations = generations
+        self.mutation_rate = mutation_rate
+        # (low, high) decision vectors are clipped to after variation
+        self.bounds = bounds
+        # Hypervolume reference point for the history metrics (defaults to one past the first front)
+        self.reference = reference
+        # Called with {"generation", "generations", "front_size", "hypervolume", "spread"}; returning False stops the run
+        self.on_generation = on_generation
+        # Seed of the run's random stream (see rng.py); None draws fresh entropy
+        self.seed = seed
+        self.history = None
+        self.stats = {}
+
+    def _evaluate(self, population):
+        return np.asarray(self.objectives(population), dtype=float).reshape(len(population), -1)
+
+    def _offspring(self, population, ranks, crowding):
+        phase = self._profiler.phase
+        with phase("selection"):
+            parents1 = population[tournament(ranks, crowding, self.population_size)]
+            parents2 = population[tournament(ranks, crowding, self.population_size)]
+        with phase("breeding"):
+            children = self.breed(parents1, parents2)
+        with phase("mutation"):
+            children = self.mutate(children, self.mutation_rate)
+            if self.bounds is not None:
+                children = np.clip(children, *self.bounds)
+        return children
+
+    def run(self):
+        self._profiler = Profiler()
+        self._profiler.start()
+        with rng.use(rng.make(self.seed)):
+            result = self._run()
+        self._profiler.stop()
+        self.stats["profile"] = self._profiler.summary()
+        return result
+
+    def _run(self):
+        phase = self._profiler.phase
+        with phase("initialization"):
+            population = np.asarray(self.create_population(self.population_size), dtype=float)
+            if population.ndim == 1:
+                population = population[:, None]
+        with phase("evaluation"):
+            objs = self._evaluate(population)
+        evaluations = len(population)
+        with phase("sorting"):
+            order, ranks, crowding = select(objs, self.population_size)
+        population, objs = population[order], objs[order]
+        self.history = ParetoHistory(objs.shape[1], self.generations, reference=self.reference)
+
+        for gen in range(self.generations):
+            with phase("reporting"):
+                front = ranks == 0
+                self.history.append(objs[front])
+                stop = self.on_generation is not None and self.on_generation({
+                    "generation": gen + 1,
+                    "generations": self.generations,
+                    "front_size": int(front.sum()),
+                    "hypervolume": float(self.history.hypervolume[gen]),
+                    "spread": float(self.history.spread[gen]),
+                }) is False
+            if stop:
+                self._profiler.end_generation()
+                break
+            # (mu + lambda): parents and children compete for the next population
+            children = self._offspring(population, ranks, crowding)
+            combined = np.concatenate([population, children])
+            with phase("evaluation"):
+                combined_objs = np.concatenate([objs, self._evaluate(children)])
+            evaluations += len(children)
+            with phase("sorting"):
+                order, ranks, crowding = select(combined_objs, self.population_size)
+            population, objs = combined[order], combined_objs[order]
+            self._profiler.end_generation()
+
+        self.stats = {"evaluations": evaluations, "generations_run": len(self.history)}
+        front = dominance_ranks(objs) == 0
+        return population[front], objs[front], self.history
@@ -0,0 +1,138 @@
+import numpy as np
+
+# Per-generation Pareto fronts of a multi-objective run, kept compact: every stored front
+# lives in one growing float array with offsets per generation, next to per-generation
+# metrics. When the point budget is reached, every other stored front is dropped, so
+# memory stays bounded and the kept fronts stay evenly spread over the run.
+
+MAX_POINTS = 200_000
+HYPERVOLUME_SAMPLES = 20_000
+BLOCK_ELEMENTS = 1 << 22
+
+def hypervolume(front, reference):
+    # Volume dominated by the front and bounded by the reference point (minimization)
+    front = np.asarray(front, dtype=float)
+    front = front[(front < reference).all(axis=1)]
+    if len(front) == 0:
+        return 0.0
+    if front.shape[1] == 2:
+        # Exact: sweep by f1, each point adds the slab up to the lowest f2 so far
+        front = front[np.lexsort((front[:, 1], front[:, 0]))]
+        best_f2 = np.minimum.accumulate(np.r_[reference[1], front[:, 1]])
+        widths = np.diff(np.r_[front[:, 0], reference[0]])
+        return float((widths * (reference[1] - best_f2[1:])).sum())
+    # More objectives: Monte Carlo estimate over the box between the front's ideal point
+    # and the reference, with a fixed sample so successive generations are comparable
+    low = front.min(axis=0)
+    samples = low + np.random.default_rng(0).random((HYPERVOLUME_SAMPLES, front.shape[1])) * (reference - low)
+    dominated = np.zeros(len(samples), dtype=bool)
+    block = max(1, BLOCK_ELEMENTS // (len(samples) * front.shape[1]))
+    for start in range(0, len(front), block):
+        dominated |= (front[start:start + block, None, :] <= samples).all(axis=2).any(axis=0)
+    return float(dominated.mean() * np.prod(reference - low))
+
+def spread(front):
+    # Uniformity of the front: 0 for evenly spaced points, larger when they clump.
+    # Uses gaps between neighbours along f1 for two objectives, nearest-neighbour distances otherwise.
+    front = np.asarray(front, dtype=float)
+    if len(front) < 3:
+        return 0.0
+    if front.shape[1] == 2:
+        front = front[np.argsort(front[:, 0], kind="stable")]
+        gaps = np.linalg.norm(np.diff(front, axis=0), axis=1)
+    else:
+        gaps = np.empty(len(front))
+        block = max(1, BLOCK_ELEMENTS // (len(front) * front.shape[1]))
+        for start in range(0, len(front), block):
+            d = np.linalg.norm(front[start:start + block, None, :] - front, axis=2)
+            d[np.arange(len(d)), np.arange(start, start + len(d))] = np.inf
+            gaps[start:start + block] = d.min(axis=1)
+    mean = gaps.mean()
+    return float(np.abs(gaps - mean).sum() / (len(gaps) * mean)) if mean > 0 else 0.0
+
+class ParetoHistory:
+    def __init__(self, n_objectives, generations, reference=None, max_points=MAX_POINTS):
+        self.n_objectives = n_objectives
+        # Reference point for hypervolume; taken from the first front when not given
+        self.reference = None if reference is None else np.asarray(reference, dtype=float)
+        self.max_points = max_points
+        # Metrics for every generation
+        self.front_size = np.zeros(generations, dtype=np.int64)
+        self.hypervolume = np.zeros(generations)
+        self.spread = np.zeros(generations)
+        self.length = 0
+        # Stored fronts: points[offsets[i]:offsets[i + 1]] belongs to generation stored_generations[i]
+        self.points = np.empty((min(1024, max_points), n_objectives))
+        self.offsets = np.zeros(generations + 1, dtype=np.int64)
+        self.stored_generations = np.zeros(generations, dtype=np.int64)
+        self.stored = 0
+        self.stride = 1
+
+    def __len__(self):
+        return self.length
+
+    def append(self, front):
+        front = np.asarray(front, dtype=float).reshape(-1, self.n_objectives)
+        gen = self.length
+        if self.reference is None:
+            span = front.max(axis=0) - front.min(axis=0)
+            self.reference = front.max(axis=0) + np.where(span > 0, 0.1 * span, 1.0)
+        self.front_size[gen] = len(front)
+        self.hypervolume[gen] = hypervolume(front, self.reference)
+        self.spread[gen] = spread(front)
+        self.length += 1
+        if gen % self.stride == 0:
+            self._store(gen, front)
+
+    def _store(self, gen, front):
+        end = self.offsets[self.stored]
+        while end + len(front) > self.max_points and self.stored > 1:
+            self._thin()
+            if gen % self.stride:
+                return
+            end = self.offsets[self.stored]
+        if end + len(front) > len(self.points):
+            grown = np.empty((max(2 * len(self.points), end + len(front)), self.n_objectives))
+            grown[:end] = self.points[:end]
+            self.points = grown
+        self.points[end:end + len(front)] = front
+        self.stored_generations[self.stored] = gen
+        self.offsets[self.stored + 1] = end + len(front)
+        self.stored += 1
+
+    def _thin(self):
+        # Keep the fronts of every other stored generation, compacting them in place
+        self.stride *= 2
+        kept = 0
+        for i in range(self.stored):
+            if self.stored_generations[i] % self.stride:
+                continue
+            start, end = self.offsets[i], self.offsets[i + 1]
+            new_start = self.offsets[kept]
+            self.points[new_start:new_start + end - start] = self.points[start:end]
+            self.stored_generations[kept] = self.stored_generations[i]
+            self.offsets[kept + 1] = new_start + end - start
+            kept += 1
+        self.stored = kept
+
+    def front(self, i):
+        return self.points[self.offsets[i]:self.offsets[i + 1]]
+
+    def fronts(self, max_fronts=None):
+        # Stored fronts as [{"generation", "front"}], evenly downsampled to max_fronts
+        picks = range(self.stored)
+        if max_fronts is not None and self.stored > max_fronts:
+            picks = np.unique(np.linspace(0, self.stored - 1, max(max_fronts, 1)).round().astype(int))
+        return [
+            {"generation": int(self.stored_generations[i]) + 1, "front": self.front(i).tolist()}
+            for i in picks
+        ]
+
+    def summary(self):
+        n = self.length
+        return {
+            "front_size": self.front_size[:n].tolist(),
+            "hypervolume": self.hypervolume[:n].tolist(),
+            "spread": self.spread[:n].tolist(),
+            "reference": None if self.reference is None else self.reference.tolist(),
+        }
@@ -0,0 +1,244 @@
+from itertools import chain
+import numpy as np
+import rng
+
+# Crossover and mutation for permutations of 0..n-1 (e.g. TSP tours).
+# Genes double as indices into lookup arrays, so every operator is O(n) per child.
+# The *_batch variants take 2-D arrays with one permutation per row.
+
+def _cut_points(n):
+    return sorted(rng.get().integers(0, n, 2).tolist())
+
+def order_crossover(parent1, parent2):
+    # OX: keep a slice of parent1, fill the rest with parent2's remaining genes in order
+    n = len(parent1)
+    start, end = _cut_points(n)
+    child = [None] * n
+    child[start:end + 1] = parent1[start:end + 1]
+    used = bytearray(n)
+    for gene in parent1[start:end + 1]:
+        used[gene] = 1
+    fill = (gene for gene in parent2 if not used[gene])
+    for i in chain(range(start), range(end + 1, n)):
+        child[i] = next(fill)
+    return child
+
+def pmx(parent1, parent2):
+    # Partially mapped crossover, done as swaps on a copy of parent2 with a position index
+    n = len(parent1)
+    start, end = _cut_points(n)
+    child = list(parent2)
+    pos = [0] * n
+    for i, gene in enumerate(child):
+        pos[gene] = i
+    for i in range(start, end + 1):
+        gene = parent1[i]
+        j = pos[gene]
+        child[i], child[j] = gene, child[i]
+        pos[child[j]] = j
+        pos[gene] = i
+    return child
+
+def cycle_crossover(parent1, parent2):
+    # CX: alternate whole position cycles between the parents
+    n = len(parent1)
+    pos1 = [0] * n
+    for i, gene in enumerate(parent1):
+        pos1[gene] = i
+    child = [None] * n
+    from_first = True
+    for start in range(n):
+        if child[start] is not None:
+            continue
+        i = start
+        while child[i] is None:
+            child[i] = parent1[i] if from_first else parent2[i]
+            i = pos1[parent2[i]]
+        from_first = not from_first
+    return child
+
+def swap_mutation(tour, rate):
+    # Each position swaps with a random one with probability rate; copies only if something changes
+    n = len(tour)
+    generator = rng.get()
+    hits = np.flatnonzero(generator.random(n) < rate)
+    if not len(hits):
+        return tour
+    mutated = list(tour)
+    for i, j in zip(hits.tolist(), generator.integers(0, n, len(hits)).tolist()):
+        mutated[i], mutated[j] = mutated[j], mutated[i]
+    return mutated
+
+def inversion_mutation(tour, rate):
+    # With probability rate, reverse a random segment
+    if rng.get().random() >= rate:
+        return tour
+    i, j = _cut_points(len(tour))
+    return list(tour[:i]) + list(tour[i:j + 1])[::-1] + list(tour[j + 1:])
+
+def two_opt_mutation(tour, rate, dist, tries=8):
+    # With probability rate, try a few random 2-opt reversals and apply the shortest
+    generator = rng.get()
+    if generator.random() >= rate or len(tour) < 4:
+        return tour
+    t = np.asarray(tour)
+    n = len(t)
+    i = generator.integers(1, n - 1, tries)
+    j = np.minimum(i + generator.integers(1, n - 1, tries), n - 1)
+    k = int(two_opt_delta(t, i, j, dist).argmin())
+    mutated = t.copy()
+    mutated[i[k]:j[k] + 1] = t[i[k]:j[k] + 1][::-1]
+    return mutated.tolist()
+
+# Tour length changes of single moves, in O(1) per move. tours is one tour, or one row per
+# move (then i and j hold a row, or a row of candidates, per tour); dist is symmetric.
+
+def _at(tours, positions):
+    if tours.ndim == 1:
+        return tours[positions]
+    rows = np.arange(len(tours)).reshape((-1,) + (1,) * (np.ndim(positions) - 1))
+    return tours[rows, positions]
+
+def two_opt_delta(tours, i, j, dist):
+    # Reversing positions i..j (i < j)
+    n = tours.shape[-1]
+    a, b, c, d = _at(tours, i - 1), _at(tours, i), _at(tours, j), _at(tours, (j + 1) % n)
+    delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+    # Reversing the whole tour leaves its length unchanged
+    return np.where((i == 0) & (j == n - 1), 0.0, delta)
+
+def swap_delta(tours, i, j, dist):
+    # Swapping the cities at positions i and j
+    n = tours.shape[-1]
+    a, b = _at(tours, i), _at(tours, j)
+    before_i, after_i = _at(tours, i - 1), _at(tours, (i + 1) % n)
+    before_j, after_j = _at(tours, j - 1), _at(tours, (j + 1) % n)
+    delta = (dist[before_i, b] + dist[b, after_i] + dist[before_j, a] + dist[a, after_j]
+             - dist[before_i, a] - dist[a, after_i] - dist[before_j, b] - dist[b, after_j])
+    # Neighbouring positions share an edge, which the sums above drop twice
+    adjacent = ((j - i) % n == 1) | ((i - j) % n == 1)
+    return np.where(i == j, 0.0, delta + np.where(adjacent, 2 * dist[a, b], 0.0))
+
+def _segments(rows, n):
+    starts = rng.get().integers(0, n, rows)
+    ends = rng.get().integers(0, n, rows)
+    return np.minimum(starts, ends), np.maximum(starts, ends)
+
+def order_crossover_batch(parents1, parents2):
+    rows, n = parents1.shape
+    start, end = _segments(rows, n)
+    positions = np.arange(n)
+    in_segment = (positions >= start[:, None]) & (positions <= end[:, None])
+    # used[r, g]: gene g is already placed from parents1's slice in row r
+    used = np.zeros((rows, n), dtype=bool)
+    row_index = np.repeat(np.arange(rows), n).reshape(rows, n)
+    used[row_index[in_segment], parents1[in_segment]] = True
+    keep = ~used[row_index, parents2]
+    children = parents1.copy()
+    # Each row has as many free positions as kept genes, and both are read in row-major order
+    children[~in_segment] = parents2[keep]
+    return children
+
+def pmx_batch(parents1, parents2):
+    # pmx for every row at once: step k handles position start + k of each row whose
+    # segment reaches that far, so the Python loop runs over positions, not rows
+    rows, n = parents1.shape
+    start, end = _segments(rows, n)
+    children = parents2.copy()
+    pos = np.empty_like(children)
+    np.put_along_axis(pos, children, np.arange(n)[None, :], axis=1)
+    # Rows by segment length, longest first: the rows active at step k are a prefix.
+    # Indices are flat into the (rows, n) arrays.
+    order = np.argsort(start - end, kind="stable")
+    active = np.searchsorted((start - end)[order], -np.arange(n), side="right")
+    base = order * n
+    start = start[order]
+    child, where, donor = children.ravel(), pos.ravel(), parents1.ravel()
+    for k, count in enumerate(active.tolist()):
+        if not count:
+            break
+        b = base[:count]
+        i = start[:count] + k
+        gene = donor[b + i]
+        j = where[b + gene]
+        displaced = child[b + i]
+        child[b + i] = gene
+        child[b + j] = displaced
+        where[b + displaced] = j
+        where[b + gene] = i
+    return children
+
+def cycle_crossover_batch(parents1, parents2):
+    # Position i leads to pos1[parents2[i]]; each cycle of that map is labelled with its
+    # smallest position by pointer doubling, then cycles alternate between the parents
+    # in order of their labels, as in cycle_crossover
+    rows, n = parents1.shape
+    pos1 = np.empty_like(parents1)
+    np.put_along_axis(pos1, parents1, np.arange(n)[None, :], axis=1)
+    # Flat indices into the (rows, n) arrays, so each jump is a single 1-D gather
+    offset = np.arange(rows)[:, None] * n
+    step = (np.take_along_axis(pos1, parents2, axis=1) + offset).ravel()
+    label = np.arange(rows * n)
+    for _ in range(max(1, int(np.ceil(np.log2(max(n, 1)))))):
+        label = np.minimum(label, label[step])
+        step = step[step]
+    starts = label == np.arange(rows * n)
+    cycle = np.cumsum(starts.reshape(rows, n), axis=1).ravel() - 1
+    from_first = (cycle[label] % 2 == 0).reshape(rows, n)
+    return np.where(from_first, parents1, parents2)
+
+def swap_mutation_batch(population, rate):
+    return swap_mutation_batch_tracked(population, rate)[0]
+
+def swap_mutation_batch_tracked(population, rate):
+    # Also returns the swaps made, as (rows, pairs) with pairs[k] = (i, j) in the order applied
+    population = population.copy()
+    rows, n = population.shape
+    generator = rng.get()
+    hits = np.argwhere(generator.random(population.shape) < rate)
+    pairs = np.column_stack([hits[:, 1], generator.integers(0, n, len(hits))])
+    for r, i, j in swap_rounds(hits[:, 0], pairs):
+        apply_swaps(population, r, i, j)
+    return population, (hits[:, 0], pairs)
+
+def swap_rounds(rows, pairs):
+    # Swaps within a row must apply in order, so split them into rounds holding at most
+    # one swap per row (rows sorted, as np.argwhere gives them); each round is vectorised
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    order = np.argsort(rank, kind="stable")
+    bounds = np.searchsorted(rank[order], np.arange(1, rank.max() + 1)) if len(rank) else []
+    for picks in np.split(order, bounds):
+        if len(picks):
+            yield rows[picks], pairs[picks, 0], pairs[picks, 1]
+
+def apply_swaps(population, rows, i, j):
+    # In place; rows must be distinct
+    genes = population[rows, i]
+    population[rows, i] = population[rows, j]
+    population[rows, j] = genes
+
+def inversion_mutation_batch(population, rate):
+    rows, n = population.shape
+    start, end = _segments(rows, n)
+    positions = np.arange(n)
+    inside = (positions >= start[:, None]) & (positions <= end[:, None])
+    inside &= (rng.get().random(rows) < rate)[:, None]
+    source = np.where(inside, start[:, None] + end[:, None] - positions, positions)
+    return np.take_along_axis(population, source, axis=1)
+
+def two_opt_mutation_batch(population, rate, dist, tries=8):
+    # two_opt_mutation for every row: score all rows' candidate reversals in one call
+    rows, n = population.shape
+    if n < 4:
+        return population.copy()
+    generator = rng.get()
+    apply = generator.random(rows) < rate
+    i = generator.integers(1, n - 1, (rows, tries))
+    j = np.minimum(i + generator.integers(1, n - 1, (rows, tries)), n - 1)
+    k = two_opt_delta(population, i, j, dist).argmin(axis=1)[:, None]
+    start = np.take_along_axis(i, k, axis=1)
+    end = np.take_along_axis(j, k, axis=1)
+    positions = np.arange(n)
+    inside = (positions >= start) & (positions <= end) & apply[:, None]
+    source = np.where(inside, start + end - positions, positions)
+    return np.take_along_axis(population, source, axis=1)
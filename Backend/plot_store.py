@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+import uuid
+
+class PlotStore:
+    # Rendered PNGs on disk, tracked in memory so lookups don't hit the filesystem.
+    # Files older than max_age seconds are removed by sweep(), and once the
+    # directory exceeds max_bytes the least recently served files go first.
+    def __init__(self, directory="plots", max_bytes=100 * 1024 * 1024, max_age=7 * 24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evicted = 0
+        self.last_sweep = None
+        self._files = {}  # filename -> [size, created, last_access]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                self._files[entry.name] = [stat.st_size, stat.st_mtime, stat.st_mtime]
+                self._bytes += stat.st_size
+
+    def new_filename(self, prefix):
+        return f"{prefix}_{uuid.uuid4().hex}.png"
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def get(self, filename):
+        # Path if the plot is stored, marking it as recently used
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is None:
+                return None
+            entry[2] = time.time()
+        return self.path(filename)
+
+    def add(self, filename):
+        size = os.path.getsize(self.path(filename))
+        now = time.time()
+        with self._lock:
+            self._files[filename] = [size, now, now]
+            self._bytes += size
+            over_quota = self._bytes > self.max_bytes
+        if over_quota:
+            self.sweep()
+        return self.path(filename)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [name for name, (_, created, _) in self._files.items() if now - created > self.max_age]
+            for name in expired:
+                self._remove(name)
+            if self._bytes > self.max_bytes:
+                for name in sorted(self._files, key=lambda n: self._files[n][2]):
+                    if self._bytes <= self.max_bytes:
+                        break
+                    self._remove(name)
+            self.last_sweep = now
+
+    def _remove(self, name):
+        size = self._files.pop(name)[0]
+        self._bytes -= size
+        self.evicted += 1
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def start_sweeper(self, interval=300):
+        if self._sweeper is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.sweep()
+
+        self._sweeper = threading.Thread(target=loop, name="plot-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+                "evicted": self.evicted,
+                "last_sweep": self.last_sweep,
+            }
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from plot_store import PlotStore
+import metrics
+
+PLOT_DIR = "plots"
+# Disk quota and age limit for stored plots, overridable from the environment
+PLOT_MAX_BYTES = int(os.environ.get("GA_PLOT_MAX_BYTES", 100 * 1024 * 1024))
+PLOT_MAX_AGE = float(os.environ.get("GA_PLOT_MAX_AGE", 7 * 24 * 3600))
+MAX_PENDING = 1000
+# Headless tools (e.g. benchmark.py) switch plotting off; run_problem then returns None as its plot path
+ENABLED = True
+
+# Plots are described when a run finishes and only rendered when first requested.
+# Rendering uses standalone Figure objects, not pyplot's global state, so it is
+# safe from any request thread.
+_pending = OrderedDict()
+_drawing = {}  # filename -> Event set once its render finishes
+_lock = threading.Lock()
+_store = None
+
+def get_store():
+    global _store
+    with _lock:
+        if _store is None:
+            _store = PlotStore(PLOT_DIR, max_bytes=PLOT_MAX_BYTES, max_age=PLOT_MAX_AGE)
+        return _store
+
+def _register(prefix, spec):
+    if not ENABLED:
+        return None
+    store = get_store()
+    filename = store.new_filename(prefix)
+    with _lock:
+        _pending[filename] = spec
+        if len(_pending) > MAX_PENDING:
+            _pending.popitem(last=False)
+    return store.path(filename)
+
+def line_plot(prefix, y, label, xlabel, ylabel, title):
+    return _register(prefix, {
+        "kind": "line", "x": None, "y": list(y), "label": label,
+        "xlabel": xlabel, "ylabel": ylabel, "title": title,
+    })
+
+def scatter_plot(prefix, x, y, label, xlabel, ylabel, title, color=None, figsize=None):
+    return _register(prefix, {
+        "kind": "scatter", "x": list(x), "y": list(y), "label": label, "color": color,
+        "xlabel": xlabel, "ylabel": ylabel, "title": title, "figsize": figsize,
+    })
+
+def _draw(spec, path):
+    # Imported on first render so runs that never draw don't load matplotlib
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=spec.get("figsize"))
+    ax = fig.add_subplot()
+    if spec["kind"] == "scatter":
+        ax.scatter(spec["x"], spec["y"], c=spec.get("color"), label=spec["label"])
+    else:
+        ax.plot(spec["y"], label=spec["label"])
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel(spec["ylabel"])
+    ax.set_title(spec["title"])
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+
+def render(filename):
+    # Path of the PNG, drawing it from the pending spec on first use; None if unknown.
+    # The lock only claims the spec: plots draw concurrently, and a request for a plot
+    # that is already being drawn waits for that one draw.
+    store = get_store()
+    while True:
+        with _lock:
+            path = store.get(filename)
+            if path is not None:
+                return path
+            drawing = _drawing.get(filename)
+            if drawing is None:
+                spec = _pending.pop(filename, None)
+                if spec is None:
+                    return None
+                drawing = _drawing[filename] = threading.Event()
+                break
+        drawing.wait()
+    try:
+        started = time.perf_counter()
+        _draw(spec, store.path(filename))
+        metrics.record_plot_render(time.perf_counter() - started)
+        return store.add(filename)
+    except Exception:
+        # Leave the spec for the next request to retry
+        with _lock:
+            _pending[filename] = spec
+        raise
+    finally:
+        with _lock:
+            del _drawing[filename]
+        drawing.set()
@@ -1,8 +1,7 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+from functools import partial
+import plotting
+from islands import make_ga
+import bitset
 
 TARGET = [1,0,1,1,0,1,0,1,1,0,1,0]
 
@@ -13,65 +12,42 @@ def get_param_fields():
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.01, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def create_individual():
-    return [random.randint(0, 1) for _ in range(len(TARGET))]
+TARGET_WORDS = bitset.pack([TARGET])
 
-def fitness(ind):
-    return sum(1 for i, b in enumerate(ind) if b == TARGET[i])
+def fitness_batch(population):
+    # Matches are the bits where the XOR with the target is zero
+    return len(TARGET) - bitset.popcount(population ^ TARGET_WORDS)
 
-def breed(p1, p2):
-    point = random.randint(1, len(p1) - 1)
-    return p1[:point] + p2[point:]
-
-def mutate(ind, rate):
-    return [gene if random.random() > rate else 1 - gene for gene in ind]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     population_size = int(params.get("population_size", 100))
     generations = int(params.get("generations", 100))
     mutation_rate = float(params.get("mutation_rate", 0.01))
 
-    pop = [create_individual() for _ in range(population_size)]
-    history = []
-    best, best_fit = None, 0
-    for g in range(generations):
-        fits = [fitness(ind) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        # Selection
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        # Breed/mutate
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
-
-    # Plot
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/bitstring_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Matches With Target")
-    plt.title("Bitstring Match Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: bitset.random_packed(size, len(TARGET)),
+        fitness_batch=fitness_batch,
+        breed_batch=partial(bitset.one_point_crossover, length=len(TARGET)),
+        mutate_batch=partial(bitset.bit_flip, length=len(TARGET)),
+        target=len(TARGET),
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
+
+    plot_path = plotting.line_plot("bitstring", history, "Best Fitness", "Generation", "Matches With Target", "Bitstring Match Progress")
 
     result = {
-        "best": best,
+        "best": bitset.unpack_one(best, len(TARGET)),
         "score": best_fit,
         "target": TARGET,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
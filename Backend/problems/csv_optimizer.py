@@ -1,9 +1,13 @@
 import pandas as pd
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+import numpy as np
+import operator
+from functools import partial
+import threading
+from collections import OrderedDict
+import plotting
+import bitset
+import rng
+from islands import make_ga
 import os
 
 def get_param_fields():
@@ -18,78 +22,261 @@ def get_param_fields():
         {"name": "population_size", "label": "Population Size", "type": "number", "default": 50},
         {"name": "generations", "label": "Generations", "type": "number", "default": 30},
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.1, "step": 0.01},
+        # "row" picks a single row; "subset" picks a set of rows, summing objective and constraint columns
+        {"name": "mode", "label": "Mode (row/subset)", "type": "text", "default": "row", "optional": True},
+        {"name": "subset_density", "label": "Initial Subset Density", "type": "number", "default": 0.1, "min": 0, "max": 1, "step": 0.01, "optional": True},
     ]
 
-def constraint_pass(row, col, op, val):
-    if not col or not op or val is None or val == "":
-        return True
-    if op == "<=":
-        return row[col] <= val
-    if op == "<":
-        return row[col] < val
-    if op == "==":
-        return row[col] == val
-    if op == ">=":
-        return row[col] >= val
-    if op == ">":
-        return row[col] > val
-    return True
-
-def fitness(row, params):
-    if not constraint_pass(
-        row,
+# Parsed CSVs keyed by path, reused until the file's mtime changes
+MAX_CACHED_DATASETS = 8
+_datasets = OrderedDict()
+_datasets_lock = threading.Lock()
+
+CONSTRAINT_OPS = {
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+    ">=": operator.ge,
+    ">": operator.gt,
+}
+
+class Dataset:
+    def __init__(self, df):
+        self.df = df
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def column(self, name):
+        # NumPy view of a column, converted once per dataset
+        if name not in self._columns:
+            self._columns[name] = self.df[name].to_numpy()
+        return self._columns[name]
+
+def load_dataset(csv_path):
+    mtime = os.path.getmtime(csv_path)
+    with _datasets_lock:
+        cached = _datasets.get(csv_path)
+        if cached is not None and cached[0] == mtime:
+            _datasets.move_to_end(csv_path)
+            return cached[1]
+    dataset = Dataset(pd.read_csv(csv_path))
+    with _datasets_lock:
+        _datasets[csv_path] = (mtime, dataset)
+        _datasets.move_to_end(csv_path)
+        if len(_datasets) > MAX_CACHED_DATASETS:
+            _datasets.popitem(last=False)
+    return dataset
+
+def constraint_mask(dataset, col, op, val):
+    if not col or not op or val is None or val == "" or op not in CONSTRAINT_OPS:
+        return np.ones(len(dataset), dtype=bool)
+    try:
+        val = float(val)
+    except (TypeError, ValueError):
+        pass
+    return np.asarray(CONSTRAINT_OPS[op](dataset.column(col), val), dtype=bool)
+
+def fitness_table(dataset, params):
+    # Fitness of every row, so scoring a population is a single gather
+    maximize = params.get("maximize", True)
+    mask = constraint_mask(
+        dataset,
         params.get("constraint_col"),
         params.get("constraint_op"),
-        params.get("constraint_value"),
-    ):
-        return float("-inf") if params.get("maximize", True) else float("inf")
-    return row[params["objective_col"]]
+        params.get("constraint_value", params.get("constraint_val")),
+    )
+    objective = dataset.column(params["objective_col"]).astype(float)
+    return np.where(mask, objective, -np.inf if maximize else np.inf)
+
+def subset_fitness(obj_sums, cons_sums, params):
+    maximize = params.get("maximize", True)
+    op = CONSTRAINT_OPS.get(params.get("constraint_op"))
+    val = params.get("constraint_value", params.get("constraint_val"))
+    if not params.get("constraint_col") or op is None or val is None or val == "":
+        return obj_sums.copy()
+    feasible = op(cons_sums, float(val))
+    return np.where(feasible, obj_sums, -np.inf if maximize else np.inf)
+
+def infeasible_result(history, stats):
+    # No individual met the constraint: report that rather than an arbitrary row or subset
+    return {
+        "best": None,
+        "best_score": None,
+        "message": "No feasible solution: every candidate violated the constraint",
+        # Generations without a feasible candidate have an infinite best; JSON has no infinity
+        "history": [h if np.isfinite(h) else None for h in history],
+        "stats": stats,
+    }
+
+def report_objective(on_generation, sign):
+    # The engine maximizes sign * objective; report progress in the objective's own terms
+    if on_generation is None or sign > 0:
+        return on_generation
+
+    def report(info):
+        info = dict(info)
+        info["best"], info["worst"] = -info["best"], -info["worst"]
+        info["mean"], info["best_so_far"] = -info["mean"], -info["best_so_far"]
+        return on_generation(info)
+    return report
+
+def row_fitness(population, table, sign):
+    return sign * table[population[:, 0]]
+
+def mutate_rows(population, rate, n_rows):
+    # Each individual jumps to a random row with probability rate
+    generator = rng.get()
+    mutated = generator.random(len(population)) < rate
+    population = population.copy()
+    population[mutated, 0] = generator.integers(0, n_rows, int(mutated.sum()))
+    return population
+
+# Bytes of unpacked selection bits summed at a time
+SUM_CHUNK_BYTES = 64 * 1024 * 1024
+
+def selected_totals(population, columns, n_rows):
+    # (individuals, len(columns)) sums of each column over every individual's selected rows,
+    # unpacking only a few packed selections at a time
+    totals = np.zeros((len(population), len(columns)))
+    step = max(1, SUM_CHUNK_BYTES // n_rows)
+    for start in range(0, len(population), step):
+        chunk = population[start:start + step]
+        owners, rows = bitset.set_bits(chunk, n_rows)
+        for j, column in enumerate(columns):
+            totals[start:start + len(chunk), j] = np.bincount(owners, weights=column[rows], minlength=len(chunk))
+    return totals
+
+# A subset genome is the packed selection followed by TOTALS words that hold its objective
+# and constraint totals as float64. The operators keep the totals current, so scoring
+# reads them instead of summing over the selected rows.
+TOTALS = 2
+
+def totals(population):
+    # Writable (individuals, TOTALS) float64 view of the totals
+    return population[:, -TOTALS:].view(np.float64)
+
+def create_subsets(size, n_rows, density, columns):
+    population = np.zeros((size, bitset.n_words(n_rows) + TOTALS), dtype=np.uint64)
+    population[:, :-TOTALS] = bitset.random_sparse(size, n_rows, density)
+    totals(population)[:, :len(columns)] = selected_totals(population[:, :-TOTALS], columns, n_rows)
+    return population
+
+def adjust_totals(children, rows, positions, columns):
+    # Add the values of rows (positions) now selected in a child, subtract those deselected
+    selections = children[:, :-TOTALS]
+    sign = np.where(bitset.get_bits(selections, rows, positions), 1.0, -1.0)
+    sums = totals(children)
+    for j, column in enumerate(columns):
+        sums[:, j] += np.bincount(rows, weights=sign * column[positions], minlength=len(children))
+
+def crossover_subsets(parents1, parents2, n_rows, columns):
+    # One-point crossover of the selections. A child is parents1 up to the cut, so its totals
+    # are parents1's adjusted by the rows where the two differ, O(words + differing bits)
+    children = parents1.copy()
+    children[:, :-TOTALS] = bitset.one_point_crossover(parents1[:, :-TOTALS], parents2[:, :-TOTALS], n_rows)
+    rows, positions = bitset.diff_bits(children[:, :-TOTALS], parents1[:, :-TOTALS])
+    adjust_totals(children, rows, positions, columns)
+    return children
+
+def mutate_subsets(population, rate, n_rows, columns):
+    # Bit flips that add or subtract each flipped row's values, O(1) per flip
+    children = population.copy()
+    words, changed = bitset.bit_flip_tracked(population[:, :-TOTALS], rate, n_rows)
+    children[:, :-TOTALS] = words
+    adjust_totals(children, *bitset.net_flips(changed, n_rows), columns)
+    return children
+
+def subset_scores(population, params, sign):
+    sums = totals(population)
+    return sign * subset_fitness(sums[:, 0], sums[:, 1], params)
+
+def run_subset(dataset, params, on_generation=None):
+    maximize = params.get("maximize", True)
+    sign = 1 if maximize else -1
+    pop_size = int(params.get("population_size", 50))
+    generations = int(params.get("generations", 30))
+    mutation_rate = float(params.get("mutation_rate", 0.1))
+    density = float(params.get("subset_density", 0.1))
+    n_rows = len(dataset)
+    objective = dataset.column(params["objective_col"]).astype(float)
+    constraint = dataset.column(params["constraint_col"]).astype(float) if params.get("constraint_col") else None
+    columns = [objective] if constraint is None else [objective, constraint]
+
+    # One packed bitset of selected rows per individual (see bitset.py) plus its totals.
+    # Selections can be millions of rows wide, so the initial ones and mutation draw only
+    # the positions they set or flip, and the fitness cache (which hashes whole genomes) is off.
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=pop_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=partial(create_subsets, n_rows=n_rows, density=density, columns=columns),
+        fitness_batch=partial(subset_scores, params=params, sign=sign),
+        breed_batch=partial(crossover_subsets, n_rows=n_rows, columns=columns),
+        mutate_batch=partial(mutate_subsets, n_rows=n_rows, columns=columns),
+        cache=False,
+        on_generation=report_objective(on_generation, sign),
+    )
+    best, best_fit, history = ga.run()
+    history = [sign * h for h in history]
+
+    plot_path = plotting.line_plot("csv_subset", history, "Best Fitness", "Generation", "Total Objective", "CSV Subset Optimization Progress")
+    if best is None:
+        return infeasible_result(history, ga.stats), plot_path
+    best_rows = bitset.set_bits(np.array([best[:-TOTALS]], dtype=np.uint64), n_rows)[1]
+    result = {
+        "best": best_rows.tolist(),
+        "best_score": float(sign * best_fit),
+        "rows_selected": len(best_rows),
+        "objective_total": float(objective[best_rows].sum()),
+        "constraint_total": float(constraint[best_rows].sum()) if constraint is not None else None,
+        "history": history,
+        "stats": ga.stats
+    }
+    return result, plot_path
 
-def run_problem(params):
+def run_problem(params, on_generation=None):
     csv_path = os.path.join("uploaded_csvs", params["csv_filename"])
-    df = pd.read_csv(csv_path)
+    dataset = load_dataset(csv_path)
+    if params.get("mode") == "subset":
+        return run_subset(dataset, params, on_generation)
     maximize = params.get("maximize", True)
+    sign = 1 if maximize else -1
     pop_size = int(params.get("population_size", 50))
     generations = int(params.get("generations", 30))
     mutation_rate = float(params.get("mutation_rate", 0.1))
-    # For simplicity, each solution is just a row index
-    pop = [random.randint(0, len(df) - 1) for _ in range(pop_size)]
-    history = []
-    best_idx, best_fit = None, float("-inf") if maximize else float("inf")
-    for g in range(generations):
-        fits = [fitness(df.iloc[i], params) for i in pop]
-        if maximize:
-            gen_best = max(fits)
-        else:
-            gen_best = min(fits)
-        if (maximize and gen_best > best_fit) or (not maximize and gen_best < best_fit):
-            best_fit = gen_best
-            best_idx = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        # Selection: top 50%
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=maximize)[: pop_size // 2]]
-        # Crossover/mutation (just random for demo)
-        new_pop = []
-        while len(new_pop) < pop_size:
-            i = random.choice(selected)
-            if random.random() < mutation_rate:
-                i = random.randint(0, len(df) - 1)
-            new_pop.append(i)
-        pop = new_pop
-    # Plot
-    plot_path = f"plots/csv_opt_{int(time.time() * 1000)}.png"
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    plt.figure()
-    plt.plot(history, label="Best Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Objective Value")
-    plt.title("CSV Optimization Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
-    result_row = df.iloc[best_idx]
+    table = fitness_table(dataset, params)
+    n_rows = len(dataset)
+    # For simplicity, each solution is just a row index (a one-gene genome)
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=pop_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: rng.get().integers(0, n_rows, (size, 1)),
+        fitness_batch=partial(row_fitness, table=table, sign=sign),
+        breed_batch=lambda parents1, parents2: parents1.copy(),
+        mutate_batch=partial(mutate_rows, n_rows=n_rows),
+        cache=False,
+        on_generation=report_objective(on_generation, sign),
+    )
+    best, best_fit, history = ga.run()
+    history = [sign * h for h in history]
+    plot_path = plotting.line_plot("csv_opt", history, "Best Fitness", "Generation", "Objective Value", "CSV Optimization Progress")
+    # best is None when every sampled row violated the constraint
+    if best is None:
+        return infeasible_result(history, ga.stats), plot_path
+    result_row = dataset.df.iloc[best[0]]
 
     def convert_value(v):
         if hasattr(v, "item"):
@@ -98,7 +285,8 @@ def run_problem(params):
 
     result = {
         "best": {k: convert_value(v) for k, v in result_row.to_dict().items()},
-        "best_score": float(best_fit),
-        "history": [float(x) for x in history]  # make sure history is native floats
+        "best_score": float(sign * best_fit),
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -1,8 +1,8 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+from functools import partial
+import plotting
+import numpy as np
+from islands import make_ga
+import bitset
 
 def get_param_fields():
     return [
@@ -10,69 +10,60 @@ def get_param_fields():
         {"name": "k", "label": "Trap Size", "type": "number", "default": 5, "min": 2, "max": 10},
         {"name": "population_size", "label": "Population Size", "type": "number", "default": 120, "min": 10, "max": 500},
         {"name": "generations", "label": "Generations", "type": "number", "default": 120, "min": 1, "max": 1000},
+        {"name": "islands", "label": "Islands (1 = single population)", "type": "number", "default": 1, "min": 1, "max": 32},
+        {"name": "migration_interval", "label": "Migration Interval (generations)", "type": "number", "default": 10, "min": 1},
+        {"name": "topology", "label": "Migration Topology (ring/full/random)", "type": "text", "default": "ring", "optional": True},
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.02, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def trap(sub, k):
-    u = sum(sub)
-    if u == k:
-        return k
-    return k - 1 - u
+def optimum(n, k):
+    # All ones fills every full trap; a shorter last trap can't reach k, so its best is all zeros
+    full, rest = divmod(n, k)
+    return full * k + (k - 1 if rest else 0)
 
-def fitness(ind, k):
-    return sum(trap(ind[i:i+k], k) for i in range(0, len(ind), k))
+def trap_batch(u, k):
+    return np.where(u == k, k, k - 1 - u)
 
-def create_individual(n):
-    return [random.randint(0, 1) for _ in range(n)]
+def fitness_batch(population, length, k):
+    return trap_batch(bitset.block_counts(population, bitset.block_table(length, k)), k).sum(axis=1)
 
-def breed(p1, p2):
-    point = random.randint(1, len(p1)-1)
-    return p1[:point] + p2[point:]
+def delta_fitness_batch(parent_scores, parents, changed, children, length, k):
+    table = bitset.block_table(length, k)
+    rows, blocks = bitset.touched_blocks(changed, length, k)
+    gain = (trap_batch(bitset.block_counts_at(children, rows, blocks, table), k)
+            - trap_batch(bitset.block_counts_at(parents, rows, blocks, table), k))
+    return parent_scores + np.bincount(rows, gain, len(parents)).astype(parent_scores.dtype)
 
-def mutate(ind, rate):
-    return [g if random.random() > rate else 1-g for g in ind]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     n = int(params.get("n", 30))
     k = int(params.get("k", 5))
     population_size = int(params.get("population_size", 120))
     generations = int(params.get("generations", 120))
     mutation_rate = float(params.get("mutation_rate", 0.02))
-    pop = [create_individual(n) for _ in range(population_size)]
-    history = []
-    best, best_fit = None, float('-inf')
-    for g in range(generations):
-        fits = [fitness(ind, k) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/deceptive_trap_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Trap Fitness")
-    plt.title("Deceptive Trap Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: bitset.random_packed(size, n),
+        fitness_batch=partial(fitness_batch, length=n, k=k),
+        delta_fitness_batch=partial(delta_fitness_batch, length=n, k=k),
+        breed_batch=partial(bitset.one_point_crossover, length=n),
+        mutate_batch=partial(bitset.bit_flip, length=n),
+        mutate_batch_tracked=partial(bitset.bit_flip_tracked, length=n),
+        target=optimum(n, k),
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
+    plot_path = plotting.line_plot("deceptive_trap", history, "Best Fitness", "Generation", "Trap Fitness", "Deceptive Trap Progress")
     result = {
-        "best": best,
+        "best": bitset.unpack_one(best, n),
         "score": best_fit,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -1,8 +1,8 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+from functools import partial
+import numpy as np
+import plotting
+import bitset
+from islands import make_ga
 
 ITEMS = [
     {"weight": 12, "value": 4},
@@ -22,66 +22,39 @@ def get_param_fields():
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.05, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def create_individual():
-    return [random.randint(0, 1) for _ in ITEMS]
+WEIGHTS = np.array([item["weight"] for item in ITEMS])
+VALUES = np.array([item["value"] for item in ITEMS])
 
-def fitness(ind, max_weight):
-    weight = sum(ind[i] * ITEMS[i]["weight"] for i in range(len(ITEMS)))
-    value = sum(ind[i] * ITEMS[i]["value"] for i in range(len(ITEMS)))
-    if weight > max_weight:
-        return 0
-    return value
+def fitness_batch(population, max_weight):
+    bits = bitset.unpack(population, len(ITEMS))
+    return np.where(bits @ WEIGHTS > max_weight, 0, bits @ VALUES)
 
-def breed(p1, p2):
-    point = random.randint(1, len(p1) - 1)
-    return p1[:point] + p2[point:]
-
-def mutate(ind, rate):
-    return [gene if random.random() > rate else 1 - gene for gene in ind]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     max_weight = int(params.get("max_weight", 15))
     population_size = int(params.get("population_size", 80))
     generations = int(params.get("generations", 80))
     mutation_rate = float(params.get("mutation_rate", 0.05))
 
-    pop = [create_individual() for _ in range(population_size)]
-    history = []
-    best, best_fit = None, 0
-    for g in range(generations):
-        fits = [fitness(ind, max_weight) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        # Selection
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        # Breed/mutate
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: bitset.random_packed(size, len(ITEMS)),
+        fitness_batch=partial(fitness_batch, max_weight=max_weight),
+        breed_batch=partial(bitset.one_point_crossover, length=len(ITEMS)),
+        mutate_batch=partial(bitset.bit_flip, length=len(ITEMS)),
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
 
-    # Plot
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/knapsack_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Max Value Achieved")
-    plt.title("Knapsack Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    plot_path = plotting.line_plot("knapsack", history, "Best Fitness", "Generation", "Max Value Achieved", "Knapsack Progress")
 
+    best = bitset.unpack_one(best, len(ITEMS))
     picked = [i for i, x in enumerate(best) if x]
     result = {
         "best": best,
@@ -89,6 +62,7 @@ def run_problem(params):
         "items_picked": picked,
         "total_weight": sum(ITEMS[i]["weight"] for i in picked),
         "total_value": sum(ITEMS[i]["value"] for i in picked),
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -1,9 +1,7 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time  # <-- add this line
-from genetic_algorithm import GeneticAlgorithm
+from functools import partial
+import plotting
+from islands import make_ga
+import bitset
 
 def get_param_fields():
     return [
@@ -14,54 +12,39 @@ def get_param_fields():
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.1, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def create_individual(length):
-    return [random.randint(0, 1) for _ in range(length)]
+def fitness_batch(population):
+    # Packed genomes: one popcount per word
+    return bitset.popcount(population)
 
-def fitness(individual):
-    return sum(individual)
-
-def breed(parent1, parent2):
-    point = random.randint(1, len(parent1)-1)
-    return parent1[:point] + parent2[point:]
-
-def mutate(individual, mutation_rate):
-    return [bit if random.random() > mutation_rate else 1-bit for bit in individual]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     length = int(params.get("length", 50))
     population_size = int(params.get("population_size", 100))
     generations = int(params.get("generations", 100))
     mutation_rate = float(params.get("mutation_rate", 0.05))
 
-    ga = GeneticAlgorithm(
-        create_individual=lambda: create_individual(length),
-        fitness=fitness,
-        breed=breed,
-        mutate=mutate,
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
         population_size=population_size,
         generations=generations,
-        mutation_rate=mutation_rate
+        mutation_rate=mutation_rate,
+        create_population=lambda size: bitset.random_packed(size, length),
+        fitness_batch=fitness_batch,
+        breed_batch=partial(bitset.one_point_crossover, length=length),
+        mutate_batch=partial(bitset.bit_flip, length=length),
+        target=length,
+        on_generation=on_generation,
     )
     best, score, history = ga.run()
-    # Plot
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))  # Unique per run
-    plot_path = f"plots/max_ones_fitness_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Fitness")
-    plt.title("Max Ones Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    plot_path = plotting.line_plot("max_ones_fitness", history, "Best Fitness", "Generation", "Fitness", "Max Ones Progress")
     
     result = {
-        "best": best,
+        "best": bitset.unpack_one(best, length),
         "score": score,
-        "history": history  # <--- add this!
+        "history": history,  # <--- add this!
+        "stats": ga.stats
     }
     return result, plot_path    
\ No newline at end of file
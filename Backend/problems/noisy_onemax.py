@@ -1,8 +1,8 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+import rng
+from functools import partial
+import plotting
+from islands import make_ga
+import bitset
 
 def get_param_fields():
     return [
@@ -13,60 +13,37 @@ def get_param_fields():
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.02, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def create_individual(n):
-    return [random.randint(0, 1) for _ in range(n)]
+def fitness_batch(population, noise_std):
+    return bitset.popcount(population) + rng.get().normal(0, noise_std, len(population))
 
-def fitness(ind, noise_std):
-    return sum(ind) + random.gauss(0, noise_std)
-
-def breed(p1, p2):
-    point = random.randint(1, len(p1)-1)
-    return p1[:point] + p2[point:]
-
-def mutate(ind, rate):
-    return [g if random.random() > rate else 1-g for g in ind]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     n = int(params.get("n", 50))
     noise_std = float(params.get("noise_std", 2))
     population_size = int(params.get("population_size", 100))
     generations = int(params.get("generations", 100))
     mutation_rate = float(params.get("mutation_rate", 0.02))
-    pop = [create_individual(n) for _ in range(population_size)]
-    history = []
-    best, best_fit = None, float('-inf')
-    for g in range(generations):
-        fits = [fitness(ind, noise_std) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/noisy_onemax_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Noisy Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Noisy Fitness")
-    plt.title("Noisy OneMax Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: bitset.random_packed(size, n),
+        fitness_batch=partial(fitness_batch, noise_std=noise_std),
+        breed_batch=partial(bitset.one_point_crossover, length=n),
+        mutate_batch=partial(bitset.bit_flip, length=n),
+        cache="resample",
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
+    plot_path = plotting.line_plot("noisy_onemax", history, "Best Noisy Fitness", "Generation", "Noisy Fitness", "Noisy OneMax Progress")
     result = {
-        "best": best,
+        "best": bitset.unpack_one(best, n),
         "score": best_fit,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
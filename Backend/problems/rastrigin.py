@@ -1,9 +1,7 @@
-import random
-import math
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+import plotting
+import numpy as np
+from islands import make_ga
+import batch_ops
 
 def get_param_fields():
     return [
@@ -13,62 +11,38 @@ def get_param_fields():
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.1, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def rastrigin(x):
-    return 10*len(x) + sum(xi**2 - 10*math.cos(2*math.pi*xi) for xi in x)
+def fitness_batch(population):
+    return -(10 * population.shape[1] + (population ** 2 - 10 * np.cos(2 * np.pi * population)).sum(axis=1))
 
-def create_individual(dim):
-    return [random.uniform(-5.12, 5.12) for _ in range(dim)]
+def mutate_batch(population, rate):
+    return batch_ops.gaussian_mutation(population, rate, 0.3)
 
-def fitness(ind):
-    return -rastrigin(ind)  # minimize
-
-def breed(p1, p2):
-    alpha = random.random()
-    return [alpha*xi + (1-alpha)*yi for xi, yi in zip(p1, p2)]
-
-def mutate(ind, rate):
-    return [xi + random.gauss(0, 0.3) if random.random() < rate else xi for xi in ind]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     dim = int(params.get("dimensions", 2))
     population_size = int(params.get("population_size", 80))
     generations = int(params.get("generations", 80))
     mutation_rate = float(params.get("mutation_rate", 0.1))
-    pop = [create_individual(dim) for _ in range(population_size)]
-    history = []
-    best, best_fit = None, float('-inf')
-    for g in range(generations):
-        fits = [fitness(ind) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/rastrigin_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best (Negative) Rastrigin")
-    plt.xlabel("Generation")
-    plt.ylabel("Negative Rastrigin Value")
-    plt.title("Rastrigin Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: batch_ops.uniform_reals(size, dim, -5.12, 5.12),
+        fitness_batch=fitness_batch,
+        breed_batch=batch_ops.blend_crossover,
+        mutate_batch=mutate_batch,
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
+    plot_path = plotting.line_plot("rastrigin", history, "Best (Negative) Rastrigin", "Generation", "Negative Rastrigin Value", "Rastrigin Progress")
     result = {
         "best": best,
         "score": best_fit,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -1,8 +1,8 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+from functools import partial
+import plotting
+import numpy as np
+from islands import make_ga
+import bitset
 
 def get_param_fields():
     return [
@@ -10,68 +10,57 @@ def get_param_fields():
         {"name": "block_size", "label": "Block Size", "type": "number", "default": 8, "min": 2, "max": 32},
         {"name": "population_size", "label": "Population Size", "type": "number", "default": 100, "min": 10, "max": 500},
         {"name": "generations", "label": "Generations", "type": "number", "default": 100, "min": 1, "max": 1000},
+        {"name": "islands", "label": "Islands (1 = single population)", "type": "number", "default": 1, "min": 1, "max": 32},
+        {"name": "migration_interval", "label": "Migration Interval (generations)", "type": "number", "default": 10, "min": 1},
+        {"name": "topology", "label": "Migration Topology (ring/full/random)", "type": "text", "default": "ring", "optional": True},
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.01, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def fitness(ind, block_size):
-    score = 0
-    for i in range(0, len(ind), block_size):
-        block = ind[i:i+block_size]
-        if all(x == 1 for x in block):
-            score += block_size
-    return score
+def fitness_batch(population, length, block_size):
+    # A block scores when its masked popcount equals its length (the last block may be short)
+    counts = bitset.block_counts(population, bitset.block_table(length, block_size))
+    lengths = np.minimum(block_size, length - np.arange(0, length, block_size))
+    return ((counts == lengths) * block_size).sum(axis=1)
 
-def create_individual(n):
-    return [random.randint(0, 1) for _ in range(n)]
+def delta_fitness_batch(parent_scores, parents, changed, children, length, block_size):
+    # Blocks holding a flipped bit are recounted in parent and child
+    table = bitset.block_table(length, block_size)
+    rows, blocks = bitset.touched_blocks(changed, length, block_size)
+    lengths = np.minimum(block_size, length - blocks * block_size)
+    gain = ((bitset.block_counts_at(children, rows, blocks, table) == lengths).astype(np.int64)
+            - (bitset.block_counts_at(parents, rows, blocks, table) == lengths))
+    return parent_scores + np.bincount(rows, gain * block_size, len(parents)).astype(parent_scores.dtype)
 
-def breed(p1, p2):
-    point = random.randint(1, len(p1)-1)
-    return p1[:point] + p2[point:]
-
-def mutate(ind, rate):
-    return [g if random.random() > rate else 1-g for g in ind]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     n = int(params.get("n", 64))
     block_size = int(params.get("block_size", 8))
     population_size = int(params.get("population_size", 100))
     generations = int(params.get("generations", 100))
     mutation_rate = float(params.get("mutation_rate", 0.01))
-    pop = [create_individual(n) for _ in range(population_size)]
-    history = []
-    best, best_fit = None, float('-inf')
-    for g in range(generations):
-        fits = [fitness(ind, block_size) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/royalroad_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Royal Road Score")
-    plt.title("Royal Road Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: bitset.random_packed(size, n),
+        fitness_batch=partial(fitness_batch, length=n, block_size=block_size),
+        delta_fitness_batch=partial(delta_fitness_batch, length=n, block_size=block_size),
+        breed_batch=partial(bitset.one_point_crossover, length=n),
+        mutate_batch=partial(bitset.bit_flip, length=n),
+        mutate_batch_tracked=partial(bitset.bit_flip_tracked, length=n),
+        target=n,
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
+    plot_path = plotting.line_plot("royalroad", history, "Best Fitness", "Generation", "Royal Road Score", "Royal Road Progress")
     result = {
-        "best": best,
+        "best": bitset.unpack_one(best, n),
         "score": best_fit,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -1,9 +1,6 @@
-import random
-import math
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+import plotting
+from islands import make_ga
+import batch_ops
 
 def get_param_fields():
     return [
@@ -13,62 +10,38 @@ def get_param_fields():
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.08, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def sphere(x):
-    return sum(xi**2 for xi in x)
+def fitness_batch(population):
+    return -(population ** 2).sum(axis=1)
 
-def create_individual(dim):
-    return [random.uniform(-5, 5) for _ in range(dim)]
+def mutate_batch(population, rate):
+    return batch_ops.gaussian_mutation(population, rate, 0.2)
 
-def fitness(ind):
-    return -sphere(ind)  # minimize
-
-def breed(p1, p2):
-    alpha = random.random()
-    return [alpha*xi + (1-alpha)*yi for xi, yi in zip(p1, p2)]
-
-def mutate(ind, rate):
-    return [xi + random.gauss(0, 0.2) if random.random() < rate else xi for xi in ind]
-
-def run_problem(params):
+def run_problem(params, on_generation=None):
     dim = int(params.get("dimensions", 3))
     population_size = int(params.get("population_size", 60))
     generations = int(params.get("generations", 60))
     mutation_rate = float(params.get("mutation_rate", 0.08))
-    pop = [create_individual(dim) for _ in range(population_size)]
-    history = []
-    best, best_fit = None, float('-inf')
-    for g in range(generations):
-        fits = [fitness(ind) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/sphere_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best (Negative) Sphere")
-    plt.xlabel("Generation")
-    plt.ylabel("Negative Sphere Value")
-    plt.title("Sphere Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=lambda size: batch_ops.uniform_reals(size, dim, -5, 5),
+        fitness_batch=fitness_batch,
+        breed_batch=batch_ops.blend_crossover,
+        mutate_batch=mutate_batch,
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
+    plot_path = plotting.line_plot("sphere", history, "Best (Negative) Sphere", "Generation", "Negative Sphere Value", "Sphere Progress")
     result = {
         "best": best,
         "score": best_fit,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
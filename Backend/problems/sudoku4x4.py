@@ -1,8 +1,8 @@
-import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time
+import rng
+import numpy as np
+import plotting
+import batch_ops
+from islands import make_ga
 
 def get_param_fields():
     return [
@@ -11,86 +11,74 @@ def get_param_fields():
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.1, "min": 0, "max": 1, "step": 0.01},
     ]
 
-def create_individual():
-    # 4x4 grid, flatten to list
-    ind = []
-    for _ in range(4):
-        row = [1,2,3,4]
-        random.shuffle(row)
-        ind.extend(row)
-    return ind
+# Flat cell indices of the 4 rows, 4 columns and 4 boxes
+GROUPS = np.array(
+    [[r * 4 + c for c in range(4)] for r in range(4)]
+    + [[r * 4 + c for r in range(4)] for c in range(4)]
+    + [[r * 4 + c for r in range(br, br + 2) for c in range(bc, bc + 2)] for br in (0, 2) for bc in (0, 2)]
+)
 
-def fitness(ind):
-    grid = [ind[i*4:(i+1)*4] for i in range(4)]
-    score = 0
-    # Row uniqueness
-    for row in grid:
-        score += len(set(row))
-    # Column uniqueness
-    for c in range(4):
-        score += len(set(grid[r][c] for r in range(4)))
-    # 2x2 box uniqueness
-    for br in [0,2]:
-        for bc in [0,2]:
-            box = [grid[r][c] for r in range(br,br+2) for c in range(bc,bc+2)]
-            score += len(set(box))
-    return score
+# The three groups each cell belongs to
+CELL_GROUPS = np.array([np.flatnonzero((GROUPS == cell).any(axis=1)) for cell in range(16)])
 
-def breed(p1, p2):
-    point = random.randint(1, len(p1)-1)
-    return p1[:point] + p2[point:]
+def distinct_counts(cells):
+    # Distinct digits per group of 4 cells (last axis): each cell compared against each digit at once
+    return (cells[..., None] == np.arange(1, 5)).any(axis=-2).sum(axis=-1)
 
-def mutate(ind, rate):
-    ind = ind[:]
-    for i in range(len(ind)):
-        if random.random() < rate:
-            ind[i] = random.randint(1,4)
-    return ind
+def fitness_batch(population):
+    return distinct_counts(population[:, GROUPS]).sum(axis=1)
 
-def run_problem(params):
+def delta_fitness_batch(parent_scores, parents, changed, children):
+    # Each child's groups holding a changed cell, counted once
+    rows, positions = changed
+    pairs = np.unique(rows[:, None] * len(GROUPS) + CELL_GROUPS[positions])
+    rows, groups = np.divmod(pairs, len(GROUPS))
+    cells = GROUPS[groups]
+    gain = distinct_counts(children[rows[:, None], cells]) - distinct_counts(parents[rows[:, None], cells])
+    return parent_scores + np.bincount(rows, gain, len(parents)).astype(parent_scores.dtype)
+
+def create_population(size):
+    # Each grid row is a shuffled 1..4
+    rows = np.argsort(rng.get().random((size, 4, 4)), axis=2) + 1
+    return rows.reshape(size, 16)
+
+def mutate_batch_tracked(population, rate):
+    return batch_ops.random_reset_tracked(population, rate, 1, 4)
+
+def mutate_batch(population, rate):
+    return mutate_batch_tracked(population, rate)[0]
+
+def run_problem(params, on_generation=None):
     population_size = int(params.get("population_size", 100))
     generations = int(params.get("generations", 150))
     mutation_rate = float(params.get("mutation_rate", 0.1))
 
-    pop = [create_individual() for _ in range(population_size)]
-    history = []
-    best, best_fit = None, 0
-    for g in range(generations):
-        fits = [fitness(ind) for ind in pop]
-        gen_best = max(fits)
-        if gen_best > best_fit:
-            best_fit = gen_best
-            best = pop[fits.index(gen_best)]
-        history.append(gen_best)
-        # Selection
-        selected = [pop[i] for i in sorted(range(len(fits)), key=lambda i: fits[i], reverse=True)[:population_size//2]]
-        next_pop = []
-        while len(next_pop) < population_size:
-            p1, p2 = random.sample(selected, 2)
-            child = breed(p1, p2)
-            child = mutate(child, mutation_rate)
-            next_pop.append(child)
-        pop = next_pop
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
+        population_size=population_size,
+        generations=generations,
+        mutation_rate=mutation_rate,
+        create_population=create_population,
+        fitness_batch=fitness_batch,
+        delta_fitness_batch=delta_fitness_batch,
+        breed_batch=batch_ops.one_point_crossover,
+        mutate_batch=mutate_batch,
+        mutate_batch_tracked=mutate_batch_tracked,
+        target=len(GROUPS) * 4,
+        on_generation=on_generation,
+    )
+    best, best_fit, history = ga.run()
 
-    # Plot
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/sudoku4x4_{unique_id}.png"
-    plt.figure()
-    plt.plot(history, label="Best Fitness")
-    plt.xlabel("Generation")
-    plt.ylabel("Total Row/Col/Box Uniqueness")
-    plt.title("Sudoku 4x4 Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    plot_path = plotting.line_plot("sudoku4x4", history, "Best Fitness", "Generation", "Total Row/Col/Box Uniqueness", "Sudoku 4x4 Progress")
 
     result = {
         "best": best,
         "score": best_fit,
-        "history": history
+        "history": history,
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -1,100 +1,168 @@
+import os
 import random
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import time  # <-- add this line
-from genetic_algorithm import GeneticAlgorithm
+import threading
+from collections import OrderedDict
+from functools import partial
+import numpy as np
+import plotting
+import permutation_ops
+import rng
+import tsplib
+from islands import make_ga
+
+# A float32 matrix takes 4 * n^2 bytes: 100 MB at the cap
+MAX_CITIES = 5000
+# Generated layouts' matrices kept for reuse, least recently used dropped first
+MATRIX_CACHE_BYTES = 256 * 1024 * 1024
+
+_matrices = OrderedDict()
+_matrix_bytes = 0
+_lock = threading.Lock()
 
 def get_param_fields():
     return [
-        {"name": "length", "label": "List Length", "type": "number", "default": 10},
-        {"name": "target", "label": "Target Sum", "type": "number", "default": 50},
+        {"name": "instance", "label": "TSPLIB Instance (uploaded .tsp, optional)", "type": "text", "optional": True},
+        {"name": "num_cities", "label": "Number of Cities", "type": "number", "default": 10, "min": 3, "max": MAX_CITIES},
+        {"name": "seed", "label": "City Layout Seed", "type": "number", "default": 42},
         {"name": "population_size", "label": "Population Size", "type": "number", "default": 100},
         {"name": "generations", "label": "Generations", "type": "number", "default": 100},
         {"name": "mutation_rate", "label": "Mutation Rate", "type": "number", "default": 0.1, "min": 0, "max": 1, "step": 0.01},
+        {"name": "crossover", "label": "Crossover (ox/pmx/cx)", "type": "text", "default": "ox", "optional": True},
+        {"name": "mutation", "label": "Mutation (swap/inversion/two_opt)", "type": "text", "default": "swap", "optional": True},
+        {"name": "two_opt_passes", "label": "2-opt Polish Passes (0 = off)", "type": "number", "default": 0, "min": 0, "max": 50},
     ]
 
 def generate_cities(num_cities, seed=42):
-    random.seed(seed)
-    return [(random.uniform(0, 100), random.uniform(0, 100)) for _ in range(num_cities)]
-
-def create_individual(city_indices):
-    # Shuffle a list of city indices to represent a tour
-    path = city_indices[:]
-    random.shuffle(path)
-    return path
-
-def total_distance(tour, cities):
-    dist = 0
-    for i in range(len(tour)):
-        x1, y1 = cities[tour[i]]
-        x2, y2 = cities[tour[(i+1) % len(tour)]]
-        dist += ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
-    return dist
-
-def fitness(individual, cities):
-    # Lower distance is better, so invert
-    dist = total_distance(individual, cities)
-    return 1 / (dist + 1e-6)
-
-def breed(parent1, parent2):
-    # Order Crossover (OX)
-    size = len(parent1)
-    start, end = sorted([random.randint(0, size-1) for _ in range(2)])
-    child = [None] * size
-    child[start:end+1] = parent1[start:end+1]
-    fill = [gene for gene in parent2 if gene not in child]
-    ptr = 0
-    for i in range(size):
-        if child[i] is None:
-            child[i] = fill[ptr]
-            ptr += 1
-    return child
-
-def mutate(individual, mutation_rate):
-    ind = individual[:]
-    for i in range(len(ind)):
-        if random.random() < mutation_rate:
-            j = random.randint(0, len(ind)-1)
-            ind[i], ind[j] = ind[j], ind[i]
-    return ind
-
-def run_problem(params):
+    # A private Random so the layout never touches (or depends on) shared RNG state
+    layout = random.Random(seed)
+    return [(layout.uniform(0, 100), layout.uniform(0, 100)) for _ in range(num_cities)]
+
+def distance_matrix(cities):
+    coords = np.asarray(cities, dtype=float)
+    matrix = np.empty((len(coords), len(coords)), dtype=np.float32)
+    tsplib.euclidean_matrix(coords, matrix)
+    return matrix
+
+def cached_distance_matrix(num_cities, seed):
+    global _matrix_bytes
+    key = (num_cities, seed)
+    with _lock:
+        if key in _matrices:
+            _matrices.move_to_end(key)
+            return _matrices[key]
+        matrix = distance_matrix(generate_cities(num_cities, seed))
+        matrix.setflags(write=False)
+        _matrices[key] = matrix
+        _matrix_bytes += matrix.nbytes
+        while _matrix_bytes > MATRIX_CACHE_BYTES and len(_matrices) > 1:
+            _matrix_bytes -= _matrices.popitem(last=False)[1].nbytes
+        return matrix
+
+def tour_lengths(population, dist):
+    # Lengths of all tours (rows) at once: gather each edge from the matrix and sum
+    population = np.asarray(population)
+    return dist[population, np.roll(population, -1, axis=-1)].sum(axis=-1, dtype=np.float64)
+
+def fitness_batch(population, dist):
+    return 1 / (tour_lengths(population, dist) + 1e-6)
+
+def delta_fitness_batch(parent_scores, parents, changed, children, dist):
+    # Swap-mutated children scored from their parents: replay each row's swaps in order,
+    # adding up their swap_delta, instead of re-summing whole tours
+    rows, pairs = changed
+    lengths = 1 / parent_scores - 1e-6
+    tours = parents.copy()
+    for r, i, j in permutation_ops.swap_rounds(rows, pairs):
+        lengths[r] += permutation_ops.swap_delta(tours[r], i, j, dist)
+        permutation_ops.apply_swaps(tours, r, i, j)
+    return 1 / (lengths + 1e-6)
+
+def two_opt(tour, dist, max_passes=10):
+    # Local search: apply the best improving reversal for each start position,
+    # scoring every end position at once with permutation_ops.two_opt_delta
+    tour = np.array(tour)
+    n = len(tour)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            j = np.arange(i + 1, n)
+            delta = permutation_ops.two_opt_delta(tour, i, j, dist)
+            k = int(delta.argmin())
+            if delta[k] < -1e-9:
+                tour[i:j[k] + 1] = tour[i:j[k] + 1][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return tour.tolist()
+
+CROSSOVERS = {
+    "ox": permutation_ops.order_crossover_batch,
+    "pmx": permutation_ops.pmx_batch,
+    "cx": permutation_ops.cycle_crossover_batch,
+}
+
+def mutation_batch(name, dist):
+    if name in (None, "", "swap"):
+        return permutation_ops.swap_mutation_batch
+    if name == "inversion":
+        return permutation_ops.inversion_mutation_batch
+    if name == "two_opt":
+        return partial(permutation_ops.two_opt_mutation_batch, dist=dist)
+    raise ValueError(f"Unknown mutation '{name}'")
+
+def swap_delta_options(name, dist):
+    # Swap moves are scored by delta; the other mutations re-sum whole tours
+    if name not in (None, "", "swap"):
+        return {}
+    return {
+        "mutate_batch_tracked": permutation_ops.swap_mutation_batch_tracked,
+        "delta_fitness_batch": partial(delta_fitness_batch, dist=dist),
+    }
+
+def run_problem(params, on_generation=None):
     num_cities = int(params.get("num_cities", 10))
     population_size = int(params.get("population_size", 100))
     generations = int(params.get("generations", 100))
     mutation_rate = float(params.get("mutation_rate", 0.05))
     seed = int(params.get("seed", 42))
+    two_opt_passes = int(params.get("two_opt_passes", 0))
+    crossover = params.get("crossover") or "ox"
+    if crossover not in CROSSOVERS:
+        raise ValueError(f"Unknown crossover '{crossover}'")
 
-    cities = generate_cities(num_cities, seed)
-    city_indices = list(range(num_cities))
+    if params.get("instance"):
+        # Uploaded instance: the distance matrix comes memory-mapped from the tsplib cache
+        instance = tsplib.load(os.path.join(tsplib.UPLOAD_DIR, os.path.basename(params["instance"])))
+        dist = instance["matrix"]
+        num_cities = len(dist)
+    else:
+        if not 3 <= num_cities <= MAX_CITIES:
+            raise ValueError(f"num_cities must be between 3 and {MAX_CITIES}")
+        dist = cached_distance_matrix(num_cities, seed)
 
-    ga = GeneticAlgorithm(
-        create_individual=lambda: create_individual(city_indices),
-        fitness=lambda ind: fitness(ind, cities),
-        breed=breed,
-        mutate=mutate,
+    ga = make_ga(
+        params,
+        create_individual=None,
+        fitness=None,
+        breed=None,
+        mutate=None,
         population_size=population_size,
         generations=generations,
-        mutation_rate=mutation_rate
+        mutation_rate=mutation_rate,
+        create_population=lambda size: np.argsort(rng.get().random((size, num_cities)), axis=1),
+        fitness_batch=partial(fitness_batch, dist=dist),
+        breed_batch=CROSSOVERS[crossover],
+        mutate_batch=mutation_batch(params.get("mutation"), dist),
+        **swap_delta_options(params.get("mutation"), dist),
+        on_generation=on_generation,
     )
     best, score, history = ga.run()
-    best_distance = total_distance(best, cities)
-
-    import os
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    unique_id = str(int(time.time() * 1000))
-    plot_path = f"plots/tsp_fitness_{unique_id}.png"
-    plt.figure()
-    plt.plot([1/(h+1e-6) for h in history], label="Best Distance")
-    plt.xlabel("Generation")
-    plt.ylabel("Distance")
-    plt.title("TSP Progress")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(plot_path)
-    plt.close()
+    if two_opt_passes > 0:
+        best = two_opt(best, dist, two_opt_passes)
+    best_distance = float(tour_lengths(best, dist))
+    score = max(score, 1 / (best_distance + 1e-6))
+
+    plot_path = plotting.line_plot("tsp_fitness", [1/(h+1e-6) for h in history], "Best Distance", "Generation", "Distance", "TSP Progress")
 
     # Plot best path (optional)
     # best_path_plot = f"plots/tsp_best_path_{unique_id}.png"
@@ -111,6 +179,8 @@ def run_problem(params):
     result = {
         "best": best,
         "score": score,
-        "history": history  # <--- add this!
+        "distance": best_distance,
+        "history": history,  # <--- add this!
+        "stats": ga.stats
     }
     return result, plot_path
\ No newline at end of file
@@ -0,0 +1,102 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Per-phase timings for the GA loops (evaluation, selection, breeding, mutation, migration,
+# reporting). Every phase accumulates wall time over the run and per generation; the
+# run's remaining time (bookkeeping, history) shows up as "other" in the summary.
+#
+# With allocations=True each phase also records the net Python memory blocks it left
+# allocated and its peak traced memory (tracemalloc, which numpy reports to). That costs
+# a few microseconds per phase and slows allocation-heavy code, so it is opt-in, and
+# since tracemalloc is process-wide the numbers blur when several runs trace at once.
+
+class Profiler:
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        self.totals = {}
+        self.calls = {}
+        self.per_generation = {}
+        self.blocks = {}
+        self.peak_bytes = {}
+        self.generations = 0
+        self.wall_time = 0.0
+        self._generation = {}
+        self._tracing = False
+        self._started = None
+
+    def start(self):
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.wall_time = time.perf_counter() - self._started
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    @contextmanager
+    def phase(self, name):
+        if self.allocations:
+            blocks = sys.getallocatedblocks()
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._generation[name] = self._generation.get(name, 0.0) + elapsed
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self.allocations:
+                self.blocks[name] = self.blocks.get(name, 0) + sys.getallocatedblocks() - blocks
+                peak = tracemalloc.get_traced_memory()[1] - traced
+                self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), peak)
+
+    def end_generation(self):
+        # Close the current generation: phases it didn't enter get a 0
+        for name in self.totals:
+            self.per_generation.setdefault(name, [0.0] * self.generations).append(self._generation.get(name, 0.0))
+        self.generations += 1
+        self._generation = {}
+
+    def summary(self):
+        # The dict a run returns under stats["profile"]
+        phases = {
+            name: {
+                "seconds": total,
+                "calls": self.calls[name],
+                "share": total / self.wall_time if self.wall_time > 0 else 0.0,
+            }
+            for name, total in self.totals.items()
+        }
+        profile = {
+            "wall_time": self.wall_time,
+            "other_seconds": max(0.0, self.wall_time - sum(self.totals.values())),
+            "phases": phases,
+            "per_generation": {name: [round(t, 6) for t in times] for name, times in self.per_generation.items()},
+        }
+        if self.allocations:
+            for name in phases:
+                phases[name]["net_blocks"] = self.blocks.get(name, 0)
+                phases[name]["peak_bytes"] = self.peak_bytes.get(name, 0)
+        return profile
+
+def merge_profiles(profiles):
+    # Phase totals summed over several runs (e.g. islands running side by side)
+    profiles = [p for p in profiles if p]
+    phases = {}
+    for profile in profiles:
+        for name, phase in profile["phases"].items():
+            merged = phases.setdefault(name, {"seconds": 0.0, "calls": 0})
+            merged["seconds"] += phase["seconds"]
+            merged["calls"] += phase["calls"]
+    return {
+        "wall_time": max((p["wall_time"] for p in profiles), default=0.0),
+        "other_seconds": sum(p["other_seconds"] for p in profiles),
+        "phases": phases,
+    }
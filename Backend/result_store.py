@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+def canonical_key(problem_id, params):
+    # Same problem and params (including any seed) give the same key regardless of key order
+    payload = json.dumps({"problem": problem_id, "params": params or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResultStore:
+    # Completed run payloads by run id, plus an index from canonical_key to the
+    # latest run id. Entries expire after ttl seconds and the least recently used
+    # are evicted past max_entries. With persist_dir set, payloads are also
+    # written to disk and reloaded on a memory miss.
+    def __init__(self, max_entries=200, ttl=3600, persist_dir=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_dir = persist_dir
+        self._entries = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+        if persist_dir and not os.path.exists(persist_dir):
+            os.makedirs(persist_dir)
+
+    def new_run_id(self):
+        return uuid.uuid4().hex
+
+    def put(self, run_id, key, payload):
+        with self._lock:
+            self._entries[run_id] = (time.time(), key, payload)
+            self._entries.move_to_end(run_id)
+            self._by_key[key] = run_id
+            self._evict()
+        if self.persist_dir:
+            with open(self._path(run_id), "w") as f:
+                json.dump({"key": key, "created": time.time(), "payload": payload}, f)
+
+    def get(self, run_id):
+        with self._lock:
+            self._evict()
+            entry = self._entries.get(run_id)
+            if entry is not None:
+                self._entries.move_to_end(run_id)
+                return entry[2]
+        return self._load(run_id)
+
+    def get_by_key(self, key):
+        with self._lock:
+            run_id = self._by_key.get(key)
+        if run_id is None:
+            return None
+        return self.get(run_id)
+
+    def _evict(self):
+        now = time.time()
+        for run_id in [r for r, (created, _, _) in self._entries.items() if now - created > self.ttl]:
+            self._drop(run_id)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, run_id):
+        key = self._entries.pop(run_id)[1]
+        if self._by_key.get(key) == run_id:
+            del self._by_key[key]
+
+    def _path(self, run_id):
+        safe = "".join(c for c in run_id if c.isalnum())
+        return os.path.join(self.persist_dir, f"{safe}.json")
+
+    def _load(self, run_id):
+        if not self.persist_dir or not os.path.exists(self._path(run_id)):
+            return None
+        with open(self._path(run_id)) as f:
+            record = json.load(f)
+        if time.time() - record["created"] > self.ttl:
+            os.remove(self._path(run_id))
+            return None
+        with self._lock:
+            self._entries[run_id] = (record["created"], record["key"], record["payload"])
+            self._by_key.setdefault(record["key"], run_id)
+            self._evict()
+        return record["payload"]
@@ -0,0 +1,40 @@
+import contextlib
+import contextvars
+import numpy as np
+
+# Random streams for GA runs. Every run draws from its own numpy Generator on a Philox
+# (counter-based) bit generator, held in a context variable: concurrent requests on
+# different threads never share state, and a seeded run replays exactly. Islands and
+# parallel evaluation chunks get independent streams spawned from the run's seed.
+# Operators call rng.get() instead of the global random / np.random state.
+
+_current = contextvars.ContextVar("ga_rng", default=None)
+
+def sequence(seed=None):
+    # seed: None (fresh entropy), an int, or a SeedSequence (e.g. one returned by spawn)
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+def make(seed=None):
+    return np.random.Generator(np.random.Philox(sequence(seed)))
+
+def spawn(seed, n):
+    # n independent child seeds
+    return sequence(seed).spawn(n)
+
+def get():
+    generator = _current.get()
+    if generator is None:
+        # Called outside a run (scripts, a thread of its own): give this context a fresh stream
+        generator = make()
+        _current.set(generator)
+    return generator
+
+@contextlib.contextmanager
+def use(generator):
+    token = _current.set(generator)
+    try:
+        yield generator
+    finally:
+        _current.reset(token)
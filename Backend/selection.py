@@ -0,0 +1,85 @@
+from functools import partial
+import numpy as np
+import rng
+
+# Parent selection for GeneticAlgorithm. Each strategy takes the fitness array of the
+# current population (higher is better) and returns `count` parent indices; none of
+# them sort the population except rank selection, which needs the ranks.
+
+def top_k(scores, k):
+    # Indices of the k best scores, in no particular order: O(n) with argpartition
+    scores = np.asarray(scores, dtype=float)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k == len(scores):
+        return np.arange(len(scores))
+    return np.argpartition(-scores, k - 1)[:k]
+
+def bottom_k(scores, k):
+    return top_k(-np.asarray(scores, dtype=float), k)
+
+def truncation(scores, count, fraction=0.2):
+    # Uniformly from the best fraction of the population
+    pool = top_k(scores, max(1, int(len(scores) * fraction)))
+    return pool[rng.get().integers(0, len(pool), count)]
+
+def tournament(scores, count, size=3):
+    # Best of `size` random individuals, repeated count times
+    scores = np.asarray(scores, dtype=float)
+    candidates = rng.get().integers(0, len(scores), (count, size))
+    return candidates[np.arange(count), scores[candidates].argmax(axis=1)]
+
+def _sample(weights, count):
+    # Inverse-CDF sampling: binary search of uniform draws in the cumulative weights
+    cumulative = np.cumsum(weights)
+    if cumulative[-1] <= 0:
+        return rng.get().integers(0, len(weights), count)
+    return np.searchsorted(cumulative, rng.get().random(count) * cumulative[-1], side="right")
+
+def _proportional_weights(scores):
+    # Fitness shifted to be non-negative; infeasible (-inf/nan) individuals get no weight
+    scores = np.asarray(scores, dtype=float)
+    finite = np.isfinite(scores)
+    if not finite.any():
+        return np.ones(len(scores))
+    return np.where(finite, scores - scores[finite].min(), 0.0)
+
+def roulette(scores, count):
+    return _sample(_proportional_weights(scores), count)
+
+def rank(scores, count):
+    # Linear ranking: the worst gets weight 1, the best weight n
+    scores = np.asarray(scores, dtype=float)
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return _sample(ranks, count)
+
+def stochastic_universal(scores, count):
+    # SUS: one spin, count evenly spaced pointers; shuffled so parent pairs aren't rank-correlated
+    weights = _proportional_weights(scores)
+    cumulative = np.cumsum(weights)
+    if cumulative[-1] <= 0:
+        return rng.get().integers(0, len(weights), count)
+    step = cumulative[-1] / count
+    pointers = (rng.get().random() + np.arange(count)) * step
+    chosen = np.minimum(np.searchsorted(cumulative, pointers, side="right"), len(weights) - 1)
+    return rng.get().permutation(chosen)
+
+SELECTIONS = {
+    "truncation": truncation,
+    "tournament": tournament,
+    "rank": rank,
+    "roulette": roulette,
+    "sus": stochastic_universal,
+}
+
+def get_selection(selection, tournament_size=None):
+    # A strategy from its name, or a callable(scores, count) passed through unchanged
+    if callable(selection):
+        return selection
+    if selection not in SELECTIONS:
+        raise ValueError(f"Unknown selection '{selection}', expected one of {', '.join(SELECTIONS)}")
+    if selection == "tournament" and tournament_size:
+        return partial(tournament, size=tournament_size)
+    return SELECTIONS[selection]
@@ -0,0 +1,68 @@
+import time
+import numpy as np
+from fitness_cache import genome_key
+
+# Stopping criteria for GeneticAlgorithm, checked after every generation. The reason a
+# run ended goes to ga.stats["stop_reason"]: one of the names below, "callback" when
+# on_generation asked to stop, or "generations" when the full budget ran.
+
+# Most significant first, for summarizing several runs (e.g. islands)
+STOP_REASONS = ("target", "time_limit", "max_evaluations", "stagnation", "diversity", "callback", "generations")
+# Reasons that end every island once one island reaches them
+GLOBAL_STOP_REASONS = ("target", "time_limit")
+
+def termination_options(params):
+    # Stopping criteria that any problem can accept straight from the request params
+    # ("target" is already a problem parameter in places, so the optimum is target_fitness)
+    options = {}
+    for name, option, cast in (("target_fitness", "target", float), ("patience", "patience", int),
+                               ("time_limit", "time_limit", float), ("max_evaluations", "max_evaluations", int),
+                               ("min_diversity", "min_diversity", float)):
+        if params.get(name) not in (None, ""):
+            options[option] = cast(params[name])
+    return options
+
+def diversity(population):
+    # Fraction of distinct genomes in the population
+    if isinstance(population, np.ndarray):
+        distinct = len(np.unique(population.reshape(len(population), -1), axis=0))
+    else:
+        distinct = len({genome_key(ind) for ind in population})
+    return distinct / max(1, len(population))
+
+class Termination:
+    def __init__(self, target=None, patience=None, time_limit=None, max_evaluations=None, min_diversity=None):
+        # target: known optimum; the run ends once the best score reaches it
+        self.target = target
+        # patience: generations without a new best before giving up
+        self.patience = patience
+        # time_limit: wall-clock seconds; max_evaluations: fitness evaluations (delta ones included)
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        # min_diversity: fraction of distinct genomes below which the population has collapsed
+        self.min_diversity = min_diversity
+        self.start()
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.best = float("-inf")
+        self.stale = 0
+
+    def check(self, best_score, population, evaluations):
+        # The reason to stop after this generation, or None to keep going
+        if self.target is not None and best_score >= self.target:
+            return "target"
+        if best_score > self.best:
+            self.best = best_score
+            self.stale = 0
+        else:
+            self.stale += 1
+        if self.time_limit is not None and time.perf_counter() - self.started >= self.time_limit:
+            return "time_limit"
+        if self.max_evaluations is not None and evaluations >= self.max_evaluations:
+            return "max_evaluations"
+        if self.patience is not None and self.stale >= self.patience:
+            return "stagnation"
+        if self.min_diversity is not None and diversity(population) < self.min_diversity:
+            return "diversity"
+        return None
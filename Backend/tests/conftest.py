@@ -0,0 +1,13 @@
+import os
+import sys
+import pytest
+
+# The backend modules import each other as top-level modules (see app.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plotting
+
+@pytest.fixture(autouse=True)
+def no_plots(monkeypatch):
+    # run_problem returns None as its plot path instead of registering a plot
+    monkeypatch.setattr(plotting, "ENABLED", False)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import bitset
+import rng
+from problems import csv_optimizer, deceptive_trap, royal_road
+
+LENGTHS = [1, 63, 64, 65, 300, 1000]
+
+@pytest.fixture(autouse=True)
+def seeded_stream():
+    with rng.use(rng.make(3)):
+        yield
+
+def random_bits(rows, length, seed, density=0.5):
+    return (np.random.default_rng(seed).random((rows, length)) < density).astype(np.uint8)
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_pack_round_trip_and_popcount(length):
+    bits = random_bits(20, length, length)
+    words = bitset.pack(bits)
+    assert np.array_equal(bitset.unpack(words, length), bits)
+    assert np.array_equal(bitset.popcount(words), bits.sum(axis=1))
+
+@pytest.mark.parametrize("length", LENGTHS)
+def test_diff_bits_match_unpacked_compare(length):
+    a, b = bitset.pack(random_bits(30, length, 1)), bitset.pack(random_bits(30, length, 2))
+    rows, positions = bitset.diff_bits(a, b)
+    expected = np.nonzero(bitset.unpack(a, length) != bitset.unpack(b, length))
+    assert np.array_equal(rows, expected[0]) and np.array_equal(positions, expected[1])
+
+@pytest.mark.parametrize("length", LENGTHS[1:])
+def test_operators_keep_padding_clear(length):
+    parents = bitset.random_packed(50, length)
+    children = bitset.bit_flip(bitset.one_point_crossover(parents, parents[::-1], length), 0.3, length)
+    assert np.array_equal(bitset.pack(bitset.unpack(children, length)), children)
+
+@pytest.mark.parametrize("length,block", [(64, 8), (100, 7), (130, 64), (300, 100), (10, 3)])
+@pytest.mark.parametrize("rate", [0.02, 0.3])
+def test_block_deltas_match_recount(length, block, rate):
+    parents = bitset.pack(random_bits(200, length, length, 0.8))
+    children, changed = bitset.bit_flip_tracked(parents, rate, length)
+    for module, size in ((royal_road, {"block_size": block}), (deceptive_trap, {"k": block})):
+        scores = module.fitness_batch(parents, length, **size)
+        delta = module.delta_fitness_batch(scores, parents, changed, children, length, **size)
+        assert np.array_equal(delta, module.fitness_batch(children, length, **size))
+
+@pytest.mark.parametrize("n_rows", [10, 64, 65, 5000])
+def test_subset_totals_match_recount(n_rows):
+    generator = np.random.default_rng(n_rows)
+    columns = [generator.random(n_rows), generator.random(n_rows)]
+
+    def assert_current(population):
+        recount = csv_optimizer.selected_totals(population[:, :-csv_optimizer.TOTALS], columns, n_rows)
+        assert np.allclose(csv_optimizer.totals(population), recount)
+
+    population = csv_optimizer.create_subsets(40, n_rows, 0.1, columns)
+    assert_current(population)
+    # Totals are carried through several generations of operators without a recount
+    for _ in range(5):
+        population = csv_optimizer.crossover_subsets(population, population[::-1], n_rows, columns)
+        assert_current(population)
+        population = csv_optimizer.mutate_subsets(population, 0.05, n_rows, columns)
+        assert_current(population)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from nsga2 import dominance_ranks
+
+def brute_force_ranks(objs):
+    # Peel off the rows no remaining row dominates, one front at a time
+    objs = np.asarray(objs, dtype=float)
+    ranks = np.full(len(objs), -1)
+    remaining = list(range(len(objs)))
+    front = 0
+    while remaining:
+        current = [i for i in remaining
+                   if not any((objs[j] <= objs[i]).all() and (objs[j] < objs[i]).any() for j in remaining)]
+        ranks[current] = front
+        remaining = [i for i in remaining if i not in current]
+        front += 1
+    return ranks
+
+@pytest.mark.parametrize("objectives", [2, 3, 4])
+@pytest.mark.parametrize("values", [5, 1000])
+def test_dominance_ranks_match_brute_force(objectives, values):
+    # Few distinct values give many ties and duplicate rows
+    generator = np.random.default_rng(objectives * values)
+    for size in (1, 2, 10, 120):
+        objs = generator.integers(0, values, (size, objectives))
+        assert dominance_ranks(objs).tolist() == brute_force_ranks(objs).tolist()
+
+def test_dominance_ranks_real_valued_front():
+    x = np.random.default_rng(0).uniform(-10, 10, 200)
+    objs = np.column_stack([x ** 2, (x - 2) ** 2])
+    assert dominance_ranks(objs).tolist() == brute_force_ranks(objs).tolist()
+
+def test_dominance_ranks_empty():
+    assert len(dominance_ranks(np.zeros((0, 2)))) == 0
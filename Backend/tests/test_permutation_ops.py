@@ -0,0 +1,92 @@
+from functools import partial
+import numpy as np
+import pytest
+import permutation_ops
+import rng
+from problems import tsp
+
+SIZES = [2, 3, 4, 9, 60]
+
+def permutations(rows, n, seed):
+    return np.argsort(np.random.default_rng(seed).random((rows, n)), axis=1)
+
+def assert_permutations(population):
+    population = np.asarray(population)
+    assert (np.sort(population, axis=1) == np.arange(population.shape[1])).all()
+
+def tour_length(tour, dist):
+    return float(tsp.tour_lengths(np.asarray(tour), dist))
+
+@pytest.fixture(autouse=True)
+def seeded_stream():
+    with rng.use(rng.make(7)):
+        yield
+
+@pytest.mark.parametrize("n", SIZES)
+@pytest.mark.parametrize("crossover", [
+    permutation_ops.order_crossover_batch, permutation_ops.pmx_batch, permutation_ops.cycle_crossover_batch,
+])
+def test_batch_crossovers_give_permutations(crossover, n):
+    assert_permutations(crossover(permutations(200, n, 1), permutations(200, n, 2)))
+
+@pytest.mark.parametrize("n", SIZES)
+@pytest.mark.parametrize("rate", [0.05, 0.5, 1.0])
+def test_batch_mutations_give_permutations(n, rate):
+    population = permutations(200, n, 3)
+    dist = tsp.distance_matrix(tsp.generate_cities(n, 3))
+    for mutate in (permutation_ops.swap_mutation_batch, permutation_ops.inversion_mutation_batch,
+                   partial(permutation_ops.two_opt_mutation_batch, dist=dist)):
+        assert_permutations(mutate(population, rate))
+
+@pytest.mark.parametrize("n", SIZES)
+def test_list_operators_give_permutations(n):
+    dist = tsp.distance_matrix(tsp.generate_cities(n, 4))
+    for p1, p2 in zip(permutations(50, n, 5).tolist(), permutations(50, n, 6).tolist()):
+        for crossover in (permutation_ops.order_crossover, permutation_ops.pmx, permutation_ops.cycle_crossover):
+            assert_permutations([crossover(p1, p2)])
+        for mutate in (permutation_ops.swap_mutation, permutation_ops.inversion_mutation,
+                       partial(permutation_ops.two_opt_mutation, dist=dist)):
+            assert_permutations([mutate(p1, 0.5)])
+
+@pytest.mark.parametrize("n", SIZES)
+def test_batch_crossovers_match_list_versions(n, monkeypatch):
+    parents1, parents2 = permutations(100, n, 8), permutations(100, n, 9)
+    pairs = list(zip(parents1.tolist(), parents2.tolist()))
+    children = permutation_ops.cycle_crossover_batch(parents1, parents2)
+    assert children.tolist() == [permutation_ops.cycle_crossover(p1, p2) for p1, p2 in pairs]
+
+    # Same cut points for both versions of pmx
+    start, end = np.sort(np.random.default_rng(n).integers(0, n, (2, 100)), axis=0)
+    monkeypatch.setattr(permutation_ops, "_segments", lambda rows, length: (start, end))
+    children = permutation_ops.pmx_batch(parents1, parents2)
+    cuts = iter(zip(start.tolist(), end.tolist()))
+    monkeypatch.setattr(permutation_ops, "_cut_points", lambda length: list(next(cuts)))
+    assert children.tolist() == [permutation_ops.pmx(p1, p2) for p1, p2 in pairs]
+
+@pytest.mark.parametrize("n", [3, 4, 5, 30])
+def test_move_deltas_match_recount(n):
+    dist = tsp.distance_matrix(tsp.generate_cities(n, 10))
+    tours = permutations(20, n, 11)
+    i, j = np.divmod(np.arange(n * n), n)
+    for tour in tours:
+        before = tour_length(tour, dist)
+        swapped = np.repeat(tour[None, :], len(i), axis=0)
+        permutation_ops.apply_swaps(swapped, np.arange(len(i)), i, j)
+        expected = [tour_length(t, dist) - before for t in swapped]
+        delta = permutation_ops.swap_delta(np.repeat(tour[None, :], len(i), axis=0), i, j, dist)
+        assert np.allclose(delta, expected, atol=1e-3)
+
+        for start in range(n - 1):
+            ends = np.arange(start + 1, n)
+            expected = [tour_length(np.concatenate([tour[:start], tour[start:e + 1][::-1], tour[e + 1:]]), dist) - before
+                        for e in ends]
+            assert np.allclose(permutation_ops.two_opt_delta(tour, start, ends, dist), expected, atol=1e-3)
+
+@pytest.mark.parametrize("rate", [0.01, 0.2, 0.9])
+def test_swap_delta_fitness_matches_full_evaluation(rate):
+    dist = tsp.distance_matrix(tsp.generate_cities(40, 12))
+    parents = permutations(300, 40, 13)
+    children, changed = permutation_ops.swap_mutation_batch_tracked(parents, rate)
+    assert_permutations(children)
+    scores = tsp.delta_fitness_batch(tsp.fitness_batch(parents, dist), parents, changed, children, dist)
+    assert np.allclose(scores, tsp.fitness_batch(children, dist), rtol=1e-9)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from problems import csv_optimizer, max_ones, multiobjective_schaffer, royal_road, sudoku4x4, tsp
+
+TSP = {"num_cities": 25, "generations": 30}
+
+# Single-population runs: island migration is asynchronous (see islands.py)
+RUNS = [
+    (max_ones, {"length": 80, "generations": 30}),
+    (royal_road, {"n": 64, "generations": 30}),
+    (sudoku4x4, {"generations": 30}),
+    (tsp, TSP),
+    (tsp, {"num_cities": 25, "generations": 30, "crossover": "pmx", "mutation": "two_opt"}),
+    (multiobjective_schaffer, {"generations": 20}),
+]
+
+def run(module, params, seed):
+    result, _ = module.run_problem(dict(params, seed=seed))
+    result.pop("stats")
+    return result
+
+@pytest.mark.parametrize("module,params", RUNS, ids=lambda value: getattr(value, "__name__", ""))
+def test_seeded_runs_replay(module, params):
+    assert run(module, params, 5) == run(module, params, 5)
+
+def test_seeds_give_different_runs():
+    assert run(tsp, TSP, 5)["history"] != run(tsp, TSP, 6)["history"]
+
+def test_seeded_csv_subset_replays(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "uploaded_csvs").mkdir()
+    data = np.random.default_rng(0).random((2000, 2))
+    np.savetxt(tmp_path / "uploaded_csvs" / "data.csv", data, delimiter=",", header="value,weight", comments="")
+    params = {"csv_filename": "data.csv", "mode": "subset", "objective_col": "value", "constraint_col": "weight",
+              "constraint_op": "<=", "constraint_value": 50, "subset_density": 0.02, "generations": 15}
+    first = run(csv_optimizer, params, 9)
+    assert first == run(csv_optimizer, params, 9)
+    assert first["constraint_total"] <= 50
+    assert np.isclose(data[first["best"], 0].sum(), first["objective_total"])
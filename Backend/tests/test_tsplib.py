@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pytest
+import tsplib
+
+MATRIX = np.array([
+    [0, 3, 5, 9],
+    [3, 0, 4, 7],
+    [5, 4, 0, 2],
+    [9, 7, 2, 0],
+], dtype=float)
+
+WEIGHTS = {
+    "FULL_MATRIX": MATRIX.ravel(),
+    "UPPER_ROW": MATRIX[np.triu_indices(4, 1)],
+    "LOWER_ROW": MATRIX[np.tril_indices(4, -1)],
+    "UPPER_DIAG_ROW": MATRIX[np.triu_indices(4)],
+    "LOWER_DIAG_ROW": MATRIX[np.tril_indices(4)],
+}
+
+def explicit_text(fmt, weights, per_line=3):
+    lines = [" ".join(f"{w:g}" for w in weights[i:i + per_line]) for i in range(0, len(weights), per_line)]
+    return "\n".join([
+        "NAME : small",
+        "TYPE : TSP",
+        "DIMENSION : 4",
+        "EDGE_WEIGHT_TYPE : EXPLICIT",
+        f"EDGE_WEIGHT_FORMAT : {fmt}",
+        "EDGE_WEIGHT_SECTION",
+        *lines,
+        "EOF",
+    ])
+
+@pytest.mark.parametrize("fmt", sorted(WEIGHTS))
+def test_explicit_formats(fmt):
+    instance = tsplib.parse(explicit_text(fmt, WEIGHTS[fmt]))
+    assert instance["edge_weight_format"] == fmt
+    matrix = np.zeros((4, 4), dtype=np.float32)
+    tsplib.build_matrix(instance, matrix)
+    assert np.array_equal(matrix, MATRIX)
+
+def test_unsupported_explicit_format():
+    instance = tsplib.parse(explicit_text("UPPER_COL", WEIGHTS["UPPER_ROW"]))
+    with pytest.raises(ValueError):
+        tsplib.build_matrix(instance, np.zeros((4, 4), dtype=np.float32))
+
+def test_explicit_without_weights():
+    with pytest.raises(ValueError):
+        tsplib.parse("DIMENSION : 4\nEDGE_WEIGHT_TYPE : EXPLICIT\nEOF")
+
+def test_euc_2d_rounds_to_nearest():
+    text = "\n".join([
+        "DIMENSION : 3",
+        "EDGE_WEIGHT_TYPE : EUC_2D",
+        "NODE_COORD_SECTION",
+        "1 0 0",
+        "2 3 4",
+        "3 1 1",
+        "EOF",
+    ])
+    matrix = np.zeros((3, 3), dtype=np.float32)
+    tsplib.build_matrix(tsplib.parse(text), matrix)
+    # sqrt(2) = 1.41 rounds down, sqrt(13) = 3.61 rounds up
+    assert matrix.tolist() == [[0, 5, 1], [5, 0, 4], [1, 4, 0]]
+
+def test_load_caches_and_replaces_stale(tmp_path):
+    path = tmp_path / "small.tsp"
+    cache = tmp_path / "cache"
+    path.write_text(explicit_text("UPPER_ROW", WEIGHTS["UPPER_ROW"]))
+    first = tsplib.load(str(path), cache_dir=str(cache))
+    assert np.array_equal(first["matrix"], MATRIX)
+    assert tsplib.load(str(path), cache_dir=str(cache)) is first
+
+    # A re-upload with new weights rebuilds the matrix and drops the old cache files
+    path.write_text(explicit_text("FULL_MATRIX", 2 * WEIGHTS["FULL_MATRIX"]))
+    os.utime(path, ns=(1, 1))
+    second = tsplib.load(str(path), cache_dir=str(cache))
+    assert np.array_equal(second["matrix"], 2 * MATRIX)
+    assert all(name.startswith("small.tsp_1.") for name in os.listdir(cache))
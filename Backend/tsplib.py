@@ -0,0 +1,165 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+
+UPLOAD_DIR = "uploaded_tsps"
+CACHE_DIR = os.path.join(UPLOAD_DIR, "cache")
+BLOCK_ROWS = 512
+# Instances kept open (memory-mapped) at once, least recently used dropped first
+MAX_LOADED = 8
+
+# TSPLIB distance functions round Euclidean distances to integers
+ROUNDING = {
+    "EUC_2D": lambda d: np.floor(d + 0.5),
+    "CEIL_2D": np.ceil,
+}
+
+_loaded = OrderedDict()
+_lock = threading.Lock()
+
+def parse(text):
+    # TSPLIB .tsp with NODE_COORD_SECTION (EUC_2D/CEIL_2D) or EDGE_WEIGHT_SECTION (EXPLICIT)
+    header = {}
+    coords = None
+    weights = None
+    lines = [line.strip() for line in text.splitlines()]
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if not line or line == "EOF":
+            continue
+        if line.startswith("NODE_COORD_SECTION"):
+            n = int(header["DIMENSION"])
+            rows = [row.split() for row in lines[i:i + n]]
+            coords = np.array([[float(r[1]), float(r[2])] for r in rows])
+            i += n
+        elif line.startswith("EDGE_WEIGHT_SECTION"):
+            values = []
+            while i < len(lines) and (not lines[i] or _is_number(lines[i].split()[0])):
+                values.extend(float(v) for v in lines[i].split())
+                i += 1
+            weights = np.array(values)
+        elif line.endswith("_SECTION"):
+            # Display data, fixed edges etc. are not needed for scoring tours
+            continue
+        elif ":" in line:
+            key, value = line.split(":", 1)
+            header[key.strip().upper()] = value.strip()
+
+    if "DIMENSION" not in header:
+        raise ValueError("TSPLIB file has no DIMENSION")
+    edge_type = header.get("EDGE_WEIGHT_TYPE", "EUC_2D").upper()
+    if edge_type == "EXPLICIT":
+        if weights is None:
+            raise ValueError("EXPLICIT instance has no EDGE_WEIGHT_SECTION")
+    elif edge_type in ROUNDING:
+        if coords is None:
+            raise ValueError(f"{edge_type} instance has no NODE_COORD_SECTION")
+    else:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE '{edge_type}'")
+    return {
+        "name": header.get("NAME", ""),
+        "dimension": int(header["DIMENSION"]),
+        "edge_weight_type": edge_type,
+        "edge_weight_format": header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper(),
+        "coords": coords,
+        "weights": weights,
+    }
+
+def _is_number(token):
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+def explicit_matrix(n, weights, fmt):
+    if fmt == "FULL_MATRIX":
+        return weights[:n * n].reshape(n, n)
+    matrix = np.zeros((n, n))
+    indices = {
+        "UPPER_ROW": lambda: np.triu_indices(n, 1),
+        "LOWER_ROW": lambda: np.tril_indices(n, -1),
+        "UPPER_DIAG_ROW": lambda: np.triu_indices(n),
+        "LOWER_DIAG_ROW": lambda: np.tril_indices(n),
+    }
+    if fmt not in indices:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT '{fmt}'")
+    rows, cols = indices[fmt]()
+    matrix[rows, cols] = weights[:len(rows)]
+    matrix[cols, rows] = weights[:len(rows)]
+    return matrix
+
+def build_matrix(instance, out):
+    n = instance["dimension"]
+    if instance["coords"] is None:
+        out[:] = explicit_matrix(n, instance["weights"], instance["edge_weight_format"])
+        return
+    euclidean_matrix(instance["coords"], out, ROUNDING[instance["edge_weight_type"]])
+
+def euclidean_matrix(coords, out, rounding=None):
+    # Row blocks keep the temporary (block x n) arrays small for 10k+ city instances
+    n = len(coords)
+    for start in range(0, n, BLOCK_ROWS):
+        block = coords[start:start + BLOCK_ROWS]
+        d = np.hypot(block[:, None, 0] - coords[None, :, 0], block[:, None, 1] - coords[None, :, 1])
+        out[start:start + BLOCK_ROWS] = rounding(d) if rounding is not None else d
+
+def load(path, cache_dir=CACHE_DIR):
+    # Parsed instance with its distance matrix, memory-mapped from an .npy cache
+    # that is rebuilt only when the source file changes
+    mtime = os.stat(path).st_mtime_ns
+    key = (os.path.abspath(path), mtime)
+    with _lock:
+        if key in _loaded:
+            _loaded.move_to_end(key)
+            return _loaded[key]
+
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        stem = os.path.join(cache_dir, f"{os.path.basename(path)}_{mtime}")
+        meta_path = stem + ".json"
+        matrix_path = stem + ".dist.npy"
+        coords_path = stem + ".coords.npy"
+        if not os.path.exists(meta_path):
+            with open(path) as f:
+                instance = parse(f.read())
+            n = instance["dimension"]
+            tmp_path = stem + ".tmp.npy"
+            matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(n, n))
+            build_matrix(instance, matrix)
+            matrix.flush()
+            del matrix
+            os.replace(tmp_path, matrix_path)
+            if instance["coords"] is not None:
+                np.save(coords_path, instance["coords"])
+            with open(meta_path, "w") as f:
+                json.dump({k: instance[k] for k in ("name", "dimension", "edge_weight_type")}, f)
+            # A re-uploaded file replaces the cache built from its earlier version
+            _remove_stale(cache_dir, os.path.basename(path), mtime)
+            for old in [k for k in _loaded if k[0] == key[0]]:
+                del _loaded[old]
+
+        with open(meta_path) as f:
+            loaded = json.load(f)
+        loaded["matrix"] = np.load(matrix_path, mmap_mode="r")
+        loaded["coords"] = np.load(coords_path, mmap_mode="r") if os.path.exists(coords_path) else None
+        _loaded[key] = loaded
+        if len(_loaded) > MAX_LOADED:
+            _loaded.popitem(last=False)
+        return loaded
+
+def _remove_stale(cache_dir, basename, mtime):
+    # Cache files of other versions of the same instance
+    pattern = re.compile(rf"{re.escape(basename)}_(\d+)\.(json|dist\.npy|coords\.npy|tmp\.npy)")
+    for name in os.listdir(cache_dir):
+        match = pattern.fullmatch(name)
+        if match and int(match.group(1)) != mtime:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
@@ -119,6 +119,7 @@ function App() {
   const [paramFields, setParamFields] = useState([]);
   const [params, setParams] = useState({});
   const [result, setResult] = useState(null);
+  const [runId, setRunId] = useState(null);
   const [plotUrl, setPlotUrl] = useState(null);
 
   const [uploading, setUploading] = useState(false);
@@ -160,6 +161,7 @@ function App() {
   const handleProblemSelect = (problem) => {
     setSelectedProblem(problem);
     setResult(null);
+    setRunId(null);
     setPlotUrl(null);
     // Only fetch params for non-csv_optimizer!
     if (problem.id !== "csv_optimizer") {
@@ -179,6 +181,7 @@ function App() {
   const handleRun = async (e) => {
     e.preventDefault();
     setResult(null);
+    setRunId(null);
     setPlotUrl(null);
     setRunning(true);
     try {
@@ -187,6 +190,7 @@ function App() {
         params
       );
       setResult(res.data.result);
+      setRunId(res.data.runId);
       setPlotUrl(
         `http://127.0.0.1:5000/api/plot/${res.data.plotFilename}?t=${Date.now()}`
       );
@@ -199,8 +203,9 @@ function App() {
 
   const handleDownloadSolution = async () => {
     if (!selectedProblem) return;
+    const query = runId ? `?run_id=${runId}` : "";
     const res = await axios.post(
-      `http://127.0.0.1:5000/api/download_solution/${selectedProblem.id}`,
+      `http://127.0.0.1:5000/api/download_solution/${selectedProblem.id}${query}`,
       params,
       { responseType: "blob" }
     );
@@ -262,6 +267,7 @@ function App() {
             const found = res.data.find((x) => x.id === data.p);
             if (found) {
               setSelectedProblem(found);
+              setRunId(null);
               if (found.id !== "csv_optimizer") {
                 axios
                   .get(`http://127.0.0.1:5000/api/problem_params/${found.id}`)
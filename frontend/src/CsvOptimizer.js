@@ -284,7 +284,10 @@ export default function CsvOptimizer() {
           boxShadow: "0 2px 12px #0004"
         }}>
           <h3 style={{ fontWeight: 700, marginBottom: 10 }}>Result</h3>
-          {result.best_score !== undefined && (
+          {result.message && (
+            <div style={{ marginBottom: 8 }}>{result.message}</div>
+          )}
+          {result.best_score != null && (
             <div style={{ marginBottom: 8 }}>
               <b>Best Score:</b> {result.best_score}
             </div>